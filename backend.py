@@ -1,22 +1,277 @@
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import argparse
+import asyncio
+import bisect
+import contextvars
+import functools
+import hashlib
+import inspect
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple
 import bcrypt
-from pymongo import MongoClient
+from pymongo import (
+    IndexModel, ReadPreference, ReplaceOne, ReturnDocument, UpdateOne, ASCENDING, DESCENDING, TEXT,
+    monitoring
+)
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorClient
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+import bson
 from bson import ObjectId
 import jwt
-from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics, exported by the API on /metrics
+TASK_MANAGER_CALL_SECONDS = Histogram(
+    "task_manager_call_duration_seconds", "Wall time of TaskManager method calls", ["method"]
+)
+MONGO_COMMANDS = Counter(
+    "mongo_commands_total", "MongoDB commands issued, by calling TaskManager method", ["method", "command", "outcome"]
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round-trip time", ["method", "command"]
+)
+MONGO_DOCUMENTS_RETURNED = Counter(
+    "mongo_documents_returned_total", "Documents returned in MongoDB replies", ["method", "command"]
+)
+MONGO_REPLY_BYTES = Counter(
+    "mongo_reply_bytes_total", "BSON size of MongoDB replies", ["method", "command"]
+)
+BCRYPT_SECONDS = Histogram(
+    "bcrypt_duration_seconds", "Time spent in bcrypt", ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+BCRYPT_REJECTED = Counter(
+    "bcrypt_rejected_total", "Password hashing jobs refused because the queue was full"
+)
+TIME_LOG_FLUSH_LAG_SECONDS = Histogram(
+    "time_log_flush_lag_seconds", "Age of the oldest queued time log when the write-behind buffer flushed it",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+TIME_LOG_BUFFER_PENDING = Gauge(
+    "time_log_buffer_pending_entries", "Time logs waiting in the write-behind buffer"
+)
+TIME_LOG_BUFFER_DROPPED = Counter(
+    "time_log_buffer_dropped_total", "Time logs the write-behind buffer gave up on", ["reason"]
+)
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing pool has no free slot for more work."""
+
+class PasswordHasher:
+    """bcrypt hashing and verification on a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL, so the async methods run it on ``max_workers``
+    threads and keep the event loop free. At most ``max_queue`` further jobs
+    may wait for a thread; beyond that the async methods raise
+    PasswordHasherBusy at once instead of letting work pile up. ``rounds`` is
+    the bcrypt work factor used for new hashes.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_queue: int = 32):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def hash(self, password: str) -> bytes:
+        with BCRYPT_SECONDS.labels("hash").time():
+            return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+
+    def check(self, password: str, password_hash: bytes) -> bool:
+        with BCRYPT_SECONDS.labels("check").time():
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash)
+
+    def needs_rehash(self, password_hash: bytes) -> bool:
+        # bcrypt hashes look like $2b$<cost>$<salt+digest>
+        try:
+            return int(password_hash.split(b"$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    async def hash_async(self, password: str) -> bytes:
+        return await self._run(self.hash, password)
+
+    async def check_async(self, password: str, password_hash: bytes) -> bool:
+        return await self._run(self.check, password, password_hash)
+
+    async def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            BCRYPT_REJECTED.inc()
+            raise PasswordHasherBusy("Password hashing queue is full")
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+# Used when no hasher is passed explicitly, e.g. by Employee and scripts.
+default_password_hasher = PasswordHasher()
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time to live.
+
+    Holds at most ``maxsize`` entries, evicting the least recently used one
+    when full. Entries live for ``ttl`` seconds unless set() is given a
+    shorter ttl. Hit and miss counts are kept for monitoring.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: tuple):
+        """Drop every entry whose tuple key starts with ``prefix``."""
+        with self._lock:
+            for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+class TokenCache:
+    """Verified JWT payloads plus an in-memory revocation list.
+
+    Payloads are cached under the SHA-256 digest of the token until the
+    token's ``exp`` (or the cache TTL, whichever comes first, and the TTL
+    alone for tokens without ``exp``), so repeat requests skip signature
+    verification. Revoked digests are kept until their token would have
+    expired anyway. Both live in process memory, so a revocation only
+    applies to the worker that received it. Callers check is_revoked()
+    before get().
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600):
+        self.verified = TTLCache(maxsize, ttl)
+        self._revoked = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, digest: str) -> Optional[Dict]:
+        return self.verified.get(digest)
+
+    def put(self, digest: str, payload: Dict):
+        exp = payload.get("exp")
+        self.verified.set(digest, payload, ttl=None if exp is None else exp - time.time())
+
+    def revoke(self, digest: str, exp: Optional[float] = None):
+        with self._lock:
+            now = time.time()
+            self._revoked = {key: until for key, until in self._revoked.items() if until > now}
+            self._revoked[digest] = now + self.verified.ttl if exp is None else exp
+        self.verified.delete(digest)
+
+    def is_revoked(self, digest: str) -> bool:
+        with self._lock:
+            exp = self._revoked.get(digest)
+        return exp is not None and exp > time.time()
+
+class DashboardEvents:
+    """In-process fan-out of task change events to live dashboard subscribers.
+
+    Each subscriber owns a bounded asyncio queue. Managers subscribe with no
+    employee_id and receive every event; employees only receive events that
+    name them. A subscriber that falls max_queue events behind has its backlog
+    replaced by a single "resync" event, so a stalled client cannot make the
+    server buffer without limit. Must be used from the event loop thread.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: Dict[asyncio.Queue, Optional[int]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, employee_id: Optional[int] = None) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers[queue] = employee_id
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.pop(queue, None)
+
+    def publish(self, event: Dict, *employee_ids: Optional[int]):
+        """Deliver ``event`` to managers and to the employees in ``employee_ids``."""
+        self.published += 1
+        for queue, employee_id in list(self._subscribers.items()):
+            if employee_id is not None and employee_id not in employee_ids:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += queue.qsize()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+
+    def stats(self) -> Dict:
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
 
 class Employee:
-    def __init__(self, employee_id: int, name: str, email: str, password: str, role: str = "Employee"):
+    def __init__(self, employee_id: int, name: str, email: str, password: str, role: str = "Employee",
+                 password_hash: Optional[bytes] = None):
+        # Pass password_hash when it was already computed off the event loop.
         self.employee_id = employee_id
         self.name = name
         self.email = email
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        self.password_hash = password_hash or default_password_hasher.hash(password)
         self.role = role
         self.created_at = datetime.now().isoformat()
 
     def check_password(self, password: str) -> bool:
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash)
+        return default_password_hasher.check(password, self.password_hash)
 
     def to_dict(self):
         return {
@@ -39,11 +294,13 @@ class Task:
         self.project_id = project_id
         self.created_at = datetime.now().isoformat()
         self.updated_at = datetime.now().isoformat()
+        self.completed_at = self.created_at if status == "Completed" else None
         self.time_logs = []
 
     def update_status(self, status: str):
         self.status = status
         self.updated_at = datetime.now().isoformat()
+        self.completed_at = self.updated_at if status == "Completed" else None
 
     def add_time_log(self, employee_id: int, hours: float, description: str = ""):
         time_log = {
@@ -69,7 +326,7 @@ class Task:
             "project_id": self.project_id,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
-            "time_logs": self.time_logs,
+            "completed_at": self.completed_at,
             "total_hours": self.get_total_hours()
         }
 
@@ -91,291 +348,2933 @@ class Project:
         }
 
 class Manager(Employee):
-    def __init__(self, employee_id: int, name: str, email: str, password: str):
-        super().__init__(employee_id, name, email, password, role="Manager")
+    def __init__(self, employee_id: int, name: str, email: str, password: str,
+                 password_hash: Optional[bytes] = None):
+        super().__init__(employee_id, name, email, password, role="Manager", password_hash=password_hash)
 
-class TaskManager:
-    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/", db_name: str = "employee_management"):
-        self.client = MongoClient(mongo_uri)
-        self.db = self.client[db_name]
-        self.employees_collection = self.db.employees
-        self.tasks_collection = self.db.tasks
-        self.projects_collection = self.db.projects
+# Relative weight of each field in task search; project_name is copied onto tasks when they are written
+TASK_TEXT_WEIGHTS = {"title": 10, "project_name": 5, "description": 1}
+
+# Indexes every TaskManager ensures at startup, keyed by collection name.
+INDEXES = {
+    "employees": [
+        IndexModel([("employee_id", ASCENDING)], name="employee_id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "tasks": [
+        IndexModel([("task_id", ASCENDING)], name="task_id_unique", unique=True),
+        # Compound with task_id so filtered listings can page by task_id.
+        IndexModel([("assigned_to", ASCENDING), ("task_id", ASCENDING)], name="assigned_to_task_id"),
+        IndexModel([("project_id", ASCENDING), ("task_id", ASCENDING)], name="project_id_task_id"),
+        IndexModel([("status", ASCENDING), ("task_id", ASCENDING)], name="status_task_id"),
+        IndexModel([("priority", ASCENDING), ("task_id", ASCENDING)], name="priority_task_id"),
+        IndexModel([("status", ASCENDING), ("completed_at", ASCENDING)], name="status_completed_at"),
+        IndexModel([(field, TEXT) for field in TASK_TEXT_WEIGHTS], name="task_text", weights=TASK_TEXT_WEIGHTS),
+    ],
+    # Cold tier for completed tasks moved out by archive_completed_tasks
+    "tasks_archive": [
+        IndexModel([("task_id", ASCENDING)], name="task_id_unique", unique=True),
+        IndexModel([("assigned_to", ASCENDING), ("task_id", ASCENDING)], name="assigned_to_task_id"),
+        IndexModel([("project_id", ASCENDING), ("task_id", ASCENDING)], name="project_id_task_id"),
+    ],
+    "projects": [
+        IndexModel([("project_id", ASCENDING)], name="project_id_unique", unique=True),
+    ],
+    "time_logs": [
+        IndexModel([("task_id", ASCENDING), ("logged_at", ASCENDING)], name="task_id_logged_at"),
+        IndexModel([("employee_id", ASCENDING), ("logged_at", ASCENDING)], name="employee_id_logged_at"),
+        IndexModel([("logged_at", ASCENDING)], name="logged_at"),
+        # Logs migrated from embedded arrays carry no log_id
+        IndexModel([("log_id", ASCENDING)], name="log_id_unique", unique=True, sparse=True),
+        IndexModel([("uncounted", ASCENDING)], name="uncounted", sparse=True),
+    ],
+    "daily_hours": [
+        IndexModel([("day", ASCENDING), ("employee_id", ASCENDING), ("project_id", ASCENDING)],
+                   name="day_employee_project_unique", unique=True),
+        IndexModel([("employee_id", ASCENDING), ("day", ASCENDING)], name="employee_id_day"),
+        IndexModel([("project_id", ASCENDING), ("day", ASCENDING)], name="project_id_day"),
+    ],
+}
+
+# Task deletes archive_completed_tasks keeps in flight at once
+ARCHIVE_DELETE_CONCURRENCY = 4
+
+# Sequence counters backing id allocation: counter name -> collection it numbers.
+COUNTERS = {
+    "employee_id": "employees",
+    "task_id": "tasks",
+    "project_id": "projects",
+}
+
+# Representative filtered queries issued by TaskManager, used by explain_queries
+# to verify that each of them is served by an index. Queries that return a
+# whole collection on purpose (get_all_tasks and friends) are not listed.
+QUERY_SHAPES = [
+    ("employees", {"employee_id": 1}, None),
+    ("employees", {"email": "employee@example.com"}, None),
+    ("employees", {}, [("employee_id", DESCENDING)]),
+    ("tasks", {"task_id": 1}, None),
+    ("tasks", {"assigned_to": 1}, None),
+    ("tasks", {"project_id": 1}, None),
+    ("tasks", {"project_id": None}, None),
+    ("tasks", {"assigned_to": 1, "task_id": {"$gt": 100}}, [("task_id", ASCENDING)]),
+    ("tasks", {"status": "Pending", "task_id": {"$gt": 100}}, [("task_id", ASCENDING)]),
+    ("tasks", {}, [("task_id", DESCENDING)]),
+    ("tasks", {"status": "Completed", "completed_at": {"$lt": "2024-01-01"}}, None),
+    ("tasks", {"$text": {"$search": "report"}, "assigned_to": 1}, None),
+    ("tasks_archive", {"task_id": 1}, None),
+    ("tasks_archive", {"assigned_to": 1, "task_id": {"$gt": 100}}, [("task_id", ASCENDING)]),
+    ("projects", {"project_id": 1}, None),
+    ("projects", {}, [("project_id", DESCENDING)]),
+    ("time_logs", {"task_id": 1}, [("logged_at", ASCENDING)]),
+    ("time_logs", {"employee_id": 1, "logged_at": {"$gte": "2024-01-01"}}, [("logged_at", ASCENDING)]),
+    ("daily_hours", {"day": {"$gte": "2024-01-01", "$lt": "2024-02-01"}}, None),
+    ("daily_hours", {"employee_id": 1, "day": {"$gte": "2024-01-01", "$lt": "2024-02-01"}}, None),
+    ("daily_hours", {"project_id": 1, "day": {"$gte": "2024-01-01", "$lt": "2024-02-01"}}, None),
+]
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """Flatten the stage names of an explain() winning plan, outermost first."""
+    stages = [plan.get("stage", "")]
+    if "inputStage" in plan:
+        stages.extend(_plan_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+# Fields list endpoints may request through a projection, per collection.
+# password_hash is deliberately absent from EMPLOYEE_FIELDS.
+TASK_FIELDS = {"task_id", "title", "description", "assigned_to", "priority", "status",
+               "project_id", "project_name", "created_at", "updated_at", "completed_at", "total_hours"}
+# Default projection for task lists. Documents leave the data layer ready for JSON encoding:
+# no ObjectId, and no time_logs arrays left embedded in tasks that predate migrate-time-logs.
+TASK_LIST_PROJECTION = {"_id": 0, "time_logs": 0}
+EMPLOYEE_FIELDS = {"employee_id", "name", "email", "role", "created_at"}
+PROJECT_FIELDS = {"project_id", "name", "description", "created_by", "created_at"}
+
+def _projection(fields: Optional[List[str]], allowed: set, key: str, default: Dict) -> Dict:
+    """Build a find() projection for the requested fields.
+
+    Unknown fields are dropped and the paging key is always included, since
+    callers need it to ask for the next page.
+    """
+    if not fields:
+        return default
+    projection = {field: 1 for field in fields if field in allowed}
+    projection[key] = 1
+    projection["_id"] = 0
+    return projection
+
+def _task_filter(status: Optional[str] = None, priority: Optional[str] = None,
+                 assigned_to: Optional[int] = None) -> Dict:
+    """Build the optional status/priority/assignee conditions for task queries."""
+    query = {}
+    if status is not None:
+        query["status"] = status
+    if priority is not None:
+        query["priority"] = priority
+    if assigned_to is not None:
+        query["assigned_to"] = assigned_to
+    return query
+
+def _search_query(text: str, status: Optional[str] = None, priority: Optional[str] = None,
+                  assigned_to: Optional[int] = None, project_id: Optional[int] = None) -> Dict:
+    """Build a $text task search with the optional filters evaluated in the same query."""
+    query = {"$text": {"$search": text}, **_task_filter(status, priority, assigned_to)}
+    if project_id is not None:
+        query["project_id"] = project_id
+    return query
+
+# Projection and sort adding the relevance score to search results, best match first
+SEARCH_SCORE = {"$meta": "textScore"}
+SEARCH_SORT = [("score", SEARCH_SCORE), ("task_id", ASCENDING)]
+
+def _search_terms(text: str) -> List[str]:
+    """Lowercased word tokens, the in-memory stand-in for MongoDB's text tokenizer (no stemming)."""
+    return re.findall(r"\w+", text.lower())
+
+def _date_range_filter(field: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict:
+    """Build a [start, end) condition on a timestamp stored as an ISO string."""
+    bounds = {}
+    if start:
+        bounds["$gte"] = start.isoformat()
+    if end:
+        bounds["$lt"] = end.isoformat()
+    return {field: bounds} if bounds else {}
+
+def _dashboard_stats_pipeline(employee_id: Optional[int] = None) -> List[Dict]:
+    """Build the aggregation that computes task counters server-side.
+
+    A single $facet pass over the tasks collection returns status and priority
+    counts, so only a handful of numbers cross the wire regardless of how many
+    tasks exist. With an employee_id, only tasks assigned to them are counted.
+    """
+    def count_by(field: str) -> List[Dict]:
+        return [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+
+    pipeline = [{"$match": {"assigned_to": employee_id}}] if employee_id else []
+    pipeline.append({"$facet": {
+        "status": count_by("status"),
+        "priority": count_by("priority")
+    }})
+    return pipeline
+
+def _hours_key(employee_id: Optional[int] = None, project_id: Optional[int] = None) -> str:
+    """_id of an hour_totals counter: the grand total, or one employee's or project's hours."""
+    if employee_id is not None:
+        return f"employee:{employee_id}"
+    if project_id is not None:
+        return f"project:{project_id}"
+    return "total"
+
+def _hour_total_updates(logs: List[Dict]) -> List[UpdateOne]:
+    """Turn logged hours into upserting $inc operations on the hour_totals counters.
+
+    Each log needs employee_id, project_id (may be None) and hours. Increments
+    for the same counter are combined, so a batch costs one operation per
+    distinct counter.
+    """
+    increments = defaultdict(float)
+    for log in logs:
+        increments[_hours_key()] += log["hours"]
+        increments[_hours_key(employee_id=log["employee_id"])] += log["hours"]
+        if log["project_id"] is not None:
+            increments[_hours_key(project_id=log["project_id"])] += log["hours"]
+    return [UpdateOne({"_id": key}, {"$inc": {"hours": hours}}, upsert=True) for key, hours in increments.items()]
+
+def _project_move_updates(old_project_id: Optional[int], new_project_id: Optional[int],
+                          hours: float) -> List[UpdateOne]:
+    """$inc operations moving a task's hours from one project's counter to another's."""
+    updates = []
+    if old_project_id == new_project_id or not hours:
+        return updates
+    if old_project_id is not None:
+        updates.append(UpdateOne({"_id": _hours_key(project_id=old_project_id)}, {"$inc": {"hours": -hours}},
+                                 upsert=True))
+    if new_project_id is not None:
+        updates.append(UpdateOne({"_id": _hours_key(project_id=new_project_id)}, {"$inc": {"hours": hours}},
+                                 upsert=True))
+    return updates
+
+def _status_fields(status: str, now: str) -> Dict[str, Any]:
+    """Fields written by a status change; completed_at records when a task was last completed."""
+    return {"status": status, "updated_at": now, "completed_at": now if status == "Completed" else None}
+
+def _archive_filter(cutoff: str) -> Dict:
+    """Tasks completed before ``cutoff``, falling back to updated_at for tasks that predate completed_at."""
+    return {"status": "Completed", "$or": [
+        {"completed_at": {"$lt": cutoff}},
+        {"completed_at": None, "updated_at": {"$lt": cutoff}}
+    ]}
+
+def _archive_counts(tasks) -> Dict[str, Dict]:
+    """Count archived tasks per archive_totals counter: all tasks, and each assignee's."""
+    counts = defaultdict(lambda: {"tasks": 0, "priority": defaultdict(int)})
+    for task in tasks:
+        for key in (_hours_key(), _hours_key(employee_id=task["assigned_to"])):
+            counts[key]["tasks"] += 1
+            counts[key]["priority"][task.get("priority")] += 1
+    return counts
+
+def _archive_total_updates(tasks) -> List[UpdateOne]:
+    """Upserting $inc operations adding newly archived tasks to the archive_totals counters."""
+    return [
+        UpdateOne({"_id": key}, {"$inc": {"tasks": count["tasks"], **{
+            f"priority.{priority}": number for priority, number in count["priority"].items()
+        }}}, upsert=True)
+        for key, count in _archive_counts(tasks).items()
+    ]
+
+def _format_dashboard_stats(facets: Dict, total_hours: float, archived: Optional[Dict] = None) -> Dict:
+    """Shape the output of _dashboard_stats_pipeline into the API response.
+
+    ``archived`` is the matching archive_totals counter; archived tasks are
+    all completed and are added to the live counts.
+    """
+    status_counts = {row["_id"]: row["count"] for row in facets.get("status", [])}
+    priority_counts = {row["_id"]: row["count"] for row in facets.get("priority", [])}
+    if archived:
+        status_counts["Completed"] = status_counts.get("Completed", 0) + archived.get("tasks", 0)
+        for priority, count in archived.get("priority", {}).items():
+            priority_counts[priority] = priority_counts.get(priority, 0) + count
+
+    total_tasks = sum(status_counts.values())
+    completed_tasks = status_counts.get("Completed", 0)
+
+    return {
+        "total_tasks": total_tasks,
+        "completed_tasks": completed_tasks,
+        "pending_tasks": status_counts.get("Pending", 0),
+        "in_progress_tasks": status_counts.get("In Progress", 0),
+        "total_hours": round(total_hours, 2),
+        "completion_rate": round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 1),
+        "priority_breakdown": {
+            "high": priority_counts.get("High", 0),
+            "medium": priority_counts.get("Medium", 0),
+            "low": priority_counts.get("Low", 0)
+        }
+    }
+
+class TaskAccess(Enum):
+    """Outcome of a task operation guarded by an assignee check.
+
+    Only OK is truthy, so callers that treated the old boolean results as
+    success flags keep working.
+    """
+    OK = "ok"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    ARCHIVED = "archived"  # The task was moved to the archive, which is read-only
+    ERROR = "error"
+
+    def __bool__(self):
+        return self is TaskAccess.OK
+
+def _daily_hours_updates(logs: List[Dict], sign: int = 1) -> List[UpdateOne]:
+    """Turn time logs into upserting $inc operations on daily_hours buckets.
+
+    Buckets are keyed by (employee_id, project_id, day), with day taken from
+    logged_at. Pass sign=-1 to take the hours back out of the buckets.
+    """
+    buckets = defaultdict(lambda: [0.0, 0])
+    for log in logs:
+        bucket = buckets[(log["employee_id"], log["project_id"], log["logged_at"][:10])]
+        bucket[0] += log["hours"]
+        bucket[1] += log.get("entries", 1)
+    return [
+        UpdateOne(
+            {"employee_id": employee_id, "project_id": project_id, "day": day},
+            {"$inc": {"hours": sign * hours, "entries": sign * entries}},
+            upsert=True
+        )
+        for (employee_id, project_id, day), (hours, entries) in buckets.items()
+    ]
+
+# Expressions mapping a daily_hours bucket's day ("YYYY-MM-DD") to its report period
+REPORT_PERIODS = {
+    "day": "$day",
+    "week": {"$dateToString": {"format": "%G-W%V", "date": {"$dateFromString": {"dateString": "$day"}}}},
+    "month": {"$substrBytes": ["$day", 0, 7]},
+}
+
+# Task fields carried by "task_added" dashboard events
+DASHBOARD_EVENT_TASK_FIELDS = [
+    "task_id", "title", "description", "priority", "status", "assigned_to", "project_id", "created_at", "total_hours"
+]
+
+REPORT_GROUPS = {"employee": "employee_id", "project": "project_id"}
+
+def _hours_report_pipeline(start: date, end: date, period: str = "day", group_by: Optional[List[str]] = None,
+                           employee_id: Optional[int] = None, project_id: Optional[int] = None) -> List[Dict]:
+    """Aggregate daily_hours buckets in [start, end) into per-period hour totals.
+
+    Only buckets inside the range are read, so cost follows the range size
+    rather than the full log history. ``group_by`` may hold "employee" and/or
+    "project" to split each period further.
+    """
+    match = {"day": {"$gte": start.isoformat(), "$lt": end.isoformat()}}
+    if employee_id is not None:
+        match["employee_id"] = employee_id
+    if project_id is not None:
+        match["project_id"] = project_id
+
+    key = {"period": REPORT_PERIODS[period]}
+    for group in group_by or []:
+        key[REPORT_GROUPS[group]] = f"${REPORT_GROUPS[group]}"
+
+    return [
+        {"$match": match},
+        {"$group": {"_id": key, "hours": {"$sum": "$hours"}, "entries": {"$sum": "$entries"}}},
+        {"$match": {"entries": {"$gt": 0}}},
+        {"$sort": {"_id.period": 1}},
+        {"$replaceWith": {"$mergeObjects": ["$_id", {"hours": {"$round": ["$hours", 2]}, "entries": "$entries"}]}}
+    ]
+
+def _task_daily_hours_pipeline(task_id: int) -> List[Dict]:
+    """Sum one task's logs per (employee_id, logged_at day), for moving them between projects."""
+    return [
+        {"$match": {"task_id": task_id}},
+        {"$group": {
+            "_id": {"employee_id": "$employee_id", "logged_at": {"$substrBytes": ["$logged_at", 0, 10]}},
+            "hours": {"$sum": "$hours"},
+            "entries": {"$sum": 1}
+        }}
+    ]
+
+def _task_project_lookup(collection: str, field: str) -> Dict:
+    # let/$expr form of the join, since localField together with pipeline (and $ifNull with
+    # more than two arguments) needs MongoDB 5.0
+    return {"$lookup": {
+        "from": collection,
+        "let": {"task_id": "$task_id"},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$task_id", "$$task_id"]}}},
+            {"$project": {"_id": 0, "project_id": 1}}
+        ],
+        "as": field
+    }}
+
+# Rebuilds daily_hours from scratch out of time_logs, used by reconcile_hours
+DAILY_HOURS_REBUILD_PIPELINE = [
+    _task_project_lookup("tasks", "task"),
+    _task_project_lookup("tasks_archive", "archived_task"),
+    {"$group": {
+        "_id": {
+            "employee_id": "$employee_id",
+            "project_id": {"$ifNull": [
+                {"$arrayElemAt": ["$task.project_id", 0]},
+                {"$ifNull": [{"$arrayElemAt": ["$archived_task.project_id", 0]}, None]}
+            ]},
+            "day": {"$substrBytes": ["$logged_at", 0, 10]}
+        },
+        "hours": {"$sum": "$hours"},
+        "entries": {"$sum": 1}
+    }},
+    {"$replaceWith": {"$mergeObjects": ["$_id", {"hours": "$hours", "entries": "$entries"}]}},
+    {"$out": "daily_hours"}
+]
+
+def _guarded_set(fields: Dict[str, Any], assignee: Optional[int],
+                 increments: Optional[Dict[str, float]] = None) -> List[Dict]:
+    """Build an update pipeline that sets ``fields`` only if the task is assigned to ``assignee``.
+
+    Values are wrapped in $literal, and ``increments`` are added to the
+    current (possibly missing) numeric fields. Without an assignee the update
+    applies unconditionally. Evaluating the check inside the update keeps it
+    atomic with the write and saves the separate lookup round trip.
+    """
+    values = {field: {"$literal": value} for field, value in fields.items()}
+    for field, amount in (increments or {}).items():
+        values[field] = {"$add": [{"$ifNull": [f"${field}", 0]}, amount]}
+    if assignee is not None:
+        allowed = {"$eq": ["$assigned_to", assignee]}
+        values = {field: {"$cond": [allowed, value, f"${field}"]} for field, value in values.items()}
+    return [{"$set": values}]
+
+def _task_time_logs_pipeline(task_id: int, assignee: Optional[int], start: Optional[datetime] = None,
+                             end: Optional[datetime] = None) -> List[Dict]:
+    """Fetch a task's assignee and its time logs in one round trip.
+
+    Logs are only joined in when the task is visible to ``assignee`` (or no
+    assignee restriction applies).
+    """
+    logs = [
+        {"$match": {"task_id": task_id, **_date_range_filter("logged_at", start, end)}},
+        {"$sort": {"logged_at": 1}},
+        {"$project": TIME_LOG_PROJECTION}
+    ]
+    if assignee is not None:
+        logs.insert(1, {"$match": {"$expr": {"$eq": ["$$assignee", assignee]}}})
+    return [
+        {"$match": {"task_id": task_id}},
+        {"$project": {"_id": 0, "assigned_to": 1}},
+        {"$lookup": {
+            "from": "time_logs",
+            "let": {"assignee": "$assigned_to"},
+            "pipeline": logs,
+            "as": "time_logs"
+        }}
+    ]
+
+def _task_access(task: Optional[Dict], assignee: Optional[int]) -> TaskAccess:
+    if task is None:
+        return TaskAccess.NOT_FOUND
+    if assignee is not None and task["assigned_to"] != assignee:
+        return TaskAccess.FORBIDDEN
+    return TaskAccess.OK
+
+def _bulk_result(index: int, access: TaskAccess, detail: Optional[str] = None, **fields) -> Dict:
+    """Per-item entry returned by the bulk methods."""
+    result = {"index": index, "status": access.value, **fields}
+    if detail:
+        result["detail"] = detail
+    return result
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Counters a time log's hours are added to. A stored log lists the ones it is
+# still owed in its uncounted field until they have been incremented, and
+# keeps the writer's assignee scope in access_scope until its access check is done.
+TIME_LOG_COUNTERS = ["task_hours", "rollups"]
+# uncounted and access_scope are bookkeeping for the writers and are not returned to readers
+TIME_LOG_PROJECTION = {"_id": 0, "uncounted": 0, "access_scope": 0}
+
+def _new_log_id() -> str:
+    return uuid.uuid4().hex
+
+def _migrated_log_id(task_id: int, position: int, log: Dict) -> str:
+    # Derived from the embedded entry, so re-running migrate_time_logs upserts the same logs
+    return uuid.uuid5(uuid.NAMESPACE_OID, f"{task_id}:{position}:{log['employee_id']}:{log['logged_at']}").hex
+
+def _bulk_write_errors(error: BulkWriteError) -> Dict[int, str]:
+    """Map the operation index of each failed write in an unordered bulk to its message."""
+    return {item["index"]: item["errmsg"] for item in error.details.get("writeErrors", [])}
+
+# Name of the innermost TaskManager method running in the current context, used to
+# attribute MongoDB commands. Motor copies the context into its worker threads.
+_current_method = contextvars.ContextVar("task_manager_method", default="other")
+
+def instrumented(cls):
+    """Class decorator timing every public method of a task store, inherited ones included.
+
+    Each call is observed in TASK_MANAGER_CALL_SECONDS and marks itself as the
+    current method, so MongoCommandMetrics can attribute the commands it
+    issues. A call made from inside another instrumented call keeps the outer
+    label and is not observed separately, so nested calls are not counted
+    twice. Private helpers and generator methods are left alone; commands
+    that generators issue while being iterated are reported under "other".
+    """
+    def wrap(name, func):
+        histogram = TASK_MANAGER_CALL_SECONDS.labels(name)
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if _current_method.get() != "other":
+                    return await func(*args, **kwargs)
+                token = _current_method.set(name)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+                    _current_method.reset(token)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if _current_method.get() != "other":
+                    return func(*args, **kwargs)
+                token = _current_method.set(name)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+                    _current_method.reset(token)
+        return wrapper
+
+    # Methods inherited from TaskStore are wrapped on each backend class too
+    for name in dir(cls):
+        func = inspect.getattr_static(cls, name)
+        if (inspect.isfunction(func) and not name.startswith("_")
+                and not inspect.isgeneratorfunction(func) and not inspect.isasyncgenfunction(func)):
+            setattr(cls, name, wrap(name, func))
+    return cls
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the mongo_* Prometheus metrics.
+
+    Counts commands, their latency and the documents in cursor and
+    find-and-modify replies, labelled by the TaskManager method that issued
+    them. Commands slower than ``slow_query_ms`` are logged as warnings
+    together with their filter or pipeline. The listener API does not expose
+    the wire size of a reply, so ``measure_bytes=True`` re-encodes every
+    reply to measure it; that costs CPU on each command and is off by default.
+    """
+
+    def __init__(self, slow_query_ms: Optional[float] = None, measure_bytes: bool = False):
+        self.slow_query_ms = slow_query_ms
+        self.measure_bytes = measure_bytes
+        # (connection id, request id) -> command summary, only kept while slow-query logging is on
+        self._pending = {}
+
+    def started(self, event):
+        if self.slow_query_ms is not None:
+            command = event.command
+            summary = {key: command[key] for key in ("filter", "pipeline", "q", "query", "sort") if key in command}
+            self._pending[(event.connection_id, event.request_id)] = (command.get(event.command_name), summary)
+
+    def succeeded(self, event):
+        method = _current_method.get()
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMANDS.labels(method, event.command_name, "ok").inc()
+        MONGO_COMMAND_SECONDS.labels(method, event.command_name).observe(seconds)
+        reply = event.reply
+        cursor = reply.get("cursor")
+        if cursor:
+            documents = len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+        else:
+            documents = 1 if reply.get("value") else 0
+        if documents:
+            MONGO_DOCUMENTS_RETURNED.labels(method, event.command_name).inc(documents)
+        if self.measure_bytes:
+            MONGO_REPLY_BYTES.labels(method, event.command_name).inc(len(bson.encode(reply)))
+        self._finish(event, method, seconds)
+
+    def failed(self, event):
+        method = _current_method.get()
+        MONGO_COMMANDS.labels(method, event.command_name, "error").inc()
+        MONGO_COMMAND_SECONDS.labels(method, event.command_name).observe(event.duration_micros / 1e6)
+        self._finish(event, method, event.duration_micros / 1e6)
+
+    def _finish(self, event, method: str, seconds: float):
+        if self.slow_query_ms is None:
+            return
+        collection, summary = self._pending.pop((event.connection_id, event.request_id), (None, {}))
+        if seconds * 1000 >= self.slow_query_ms:
+            logger.warning("Slow query: %s on %s.%s took %.1fms in %s: %s", event.command_name,
+                           event.database_name, collection, seconds * 1000, method, str(summary)[:500])
+
+# Read preferences accepted for the read-only handle (``reads``) of the task managers
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool listener keeping per-server connection counts.
+
+    Tracks open and checked-out connections, operations waiting for a
+    connection and failed checkouts, so saturation of the pool can be
+    reported without reaching into driver internals.
+    """
+
+    def __init__(self):
+        self._servers = defaultdict(lambda: {"open": 0, "checked_out": 0, "waiting": 0, "checkout_failures": 0})
+        self._lock = threading.Lock()
+
+    def _add(self, address, field: str, delta: int = 1):
+        with self._lock:
+            self._servers[address][field] += delta
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._add(event.address, "open")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(event.address, "open", -1)
+
+    def connection_check_out_started(self, event):
+        self._add(event.address, "waiting")
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            server = self._servers[event.address]
+            server["waiting"] -= 1
+            server["checkout_failures"] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            server = self._servers[event.address]
+            server["waiting"] -= 1
+            server["checked_out"] += 1
+
+    def connection_checked_in(self, event):
+        self._add(event.address, "checked_out", -1)
+
+    def stats(self, max_pool_size: int) -> Dict:
+        """Per-server counts plus the highest checked-out share of ``max_pool_size`` across servers.
+
+        A max_pool_size of 0 means the pool is unbounded, which never saturates.
+        """
+        with self._lock:
+            servers = {f"{host}:{port}": dict(counts) for (host, port), counts in self._servers.items()}
+        saturation = max((server["checked_out"] / max_pool_size for server in servers.values()),
+                         default=0.0) if max_pool_size else 0.0
+        return {"max_pool_size": max_pool_size, "saturation": round(saturation, 3), "servers": servers}
+
+class CacheMetricsCollector:
+    """Prometheus collector exposing hit/miss counts of caches with a TTLCache-style stats()."""
+
+    def __init__(self, caches: Dict[str, Any]):
+        self.caches = caches
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache lookups that found an entry", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that found nothing", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries currently held", labels=["cache"])
+        for name, cache in self.caches.items():
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            size.add_metric([name], stats["size"])
+        yield from (hits, misses, size)
+
+class DashboardEventPublisher:
+    """Mixin turning successful task writes into DashboardEvents deltas; expects ``self.events``."""
+
+    def _publish_task_added(self, task: Task):
+        task_dict = task.to_dict()
+        self.events.publish({
+            "type": "task_added",
+            "task": {field: task_dict.get(field) for field in DASHBOARD_EVENT_TASK_FIELDS}
+        }, task.assigned_to)
+
+    def _publish_status_change(self, task_id: int, before: Dict, status: str):
+        self.events.publish({
+            "type": "task_status",
+            "task_id": task_id,
+            "status": status,
+            "previous_status": before.get("status")
+        }, before.get("assigned_to"))
+
+    def _publish_time_logged(self, log: Dict, assigned_to: Optional[int]):
+        self.events.publish({
+            "type": "time_logged",
+            "task_id": log["task_id"],
+            "employee_id": log["employee_id"],
+            "hours": log["hours"]
+        }, assigned_to, log["employee_id"])
+
+    def _publish_project_change(self, task_id: int, before: Dict, project_id: Optional[int]):
+        self.events.publish({
+            "type": "task_project",
+            "task_id": task_id,
+            "project_id": project_id,
+            "previous_project_id": before.get("project_id")
+        }, before.get("assigned_to"))
+
+class TaskStore(DashboardEventPublisher, ABC):
+    """Storage backend base class for AsyncTaskManager (MongoDB) and InMemoryTaskManager.
+
+    Every backend returns the same documents, TaskAccess outcomes and bulk
+    results for the same calls, so the API and scripts can run on either.
+    Storage methods are coroutines; connect, close, pool_stats, verify_token,
+    revoke_token and cache_stats stay synchronous. Logic that does not touch
+    storage (tokens, logins, task list filters, status and project changes,
+    the dashboard) lives here once, on top of the private primitives each
+    backend implements. Wrap a store in SyncTaskStore to call it from
+    blocking code.
+    """
+
+    def __init__(self, password_hasher: Optional[PasswordHasher] = None, events: Optional[DashboardEvents] = None):
         self.SECRET_KEY = "your-secret-key-here"
+        self.password_hasher = password_hasher or default_password_hasher
+        self.token_cache = TokenCache()
+        # Successful task writes are announced here for the live dashboard stream
+        self.events = events if events is not None else DashboardEvents()
 
-    # Employee Management
-    def add_employee(self, employee: Employee) -> bool:
+    # Lifecycle
+    @abstractmethod
+    def connect(self): ...
+
+    @abstractmethod
+    def close(self): ...
+
+    @abstractmethod
+    async def ping(self) -> bool: ...
+
+    @abstractmethod
+    def pool_stats(self) -> Dict: ...
+
+    async def startup(self) -> bool:
+        """Seed the id counters and ensure the indexes; False if either step failed.
+
+        The counters are seeded first and regardless of the indexes, so new
+        ids never restart below the highest one stored. Callers must not
+        serve requests after a False result.
+        """
+        seeded = await self.seed_counters()
+        indexed = await self.ensure_indexes()
+        return seeded and indexed
+
+    @abstractmethod
+    async def ensure_indexes(self) -> bool: ...
+
+    @abstractmethod
+    async def seed_counters(self) -> bool: ...
+
+    @abstractmethod
+    async def reconcile_hours(self) -> Dict: ...
+
+    @abstractmethod
+    async def archive_completed_tasks(self, older_than_days: int, batch_size: int = 1000) -> int: ...
+
+    @abstractmethod
+    async def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """Take or renew the lease ``name`` for ``holder`` until ``ttl_seconds`` from now.
+
+        Returns False while another holder's lease is unexpired, so one
+        process among many can run a periodic job.
+        """
+
+    # Ids
+    @abstractmethod
+    async def _allocate_id(self, counter: str) -> int: ...
+
+    async def get_next_employee_id(self) -> int:
         try:
-            if self.employees_collection.find_one({"employee_id": employee.employee_id}):
-                return False
-            
-            employee_data = employee.to_dict()
-            employee_data["password_hash"] = employee.password_hash
-            self.employees_collection.insert_one(employee_data)
-            return True
+            return await self._allocate_id("employee_id")
         except Exception as e:
-            print(f"Error adding employee: {e}")
-            return False
+            logger.error("Error getting next employee ID: %s", e)
+            return 1
 
-    def authenticate_employee(self, email: str, password: str) -> Optional[Dict]:
-        try:
-            employee_data = self.employees_collection.find_one({"email": email})
-            if employee_data and bcrypt.checkpw(password.encode('utf-8'), employee_data["password_hash"]):
-                token = jwt.encode({
-                    "employee_id": employee_data["employee_id"],
-                    "email": employee_data["email"],
-                    "role": employee_data["role"],
-                    "exp": datetime.utcnow() + timedelta(hours=24)
-                }, self.SECRET_KEY, algorithm="HS256")
-                
-                return {
-                    "employee_id": employee_data["employee_id"],
-                    "name": employee_data["name"],
-                    "email": employee_data["email"],
-                    "role": employee_data["role"],
-                    "token": token
-                }
+    async def get_next_task_id(self) -> int:
+        try:
+            return await self._allocate_id("task_id")
+        except Exception as e:
+            logger.error("Error getting next task ID: %s", e)
+            return 1
+
+    async def get_next_project_id(self) -> int:
+        try:
+            return await self._allocate_id("project_id")
+        except Exception as e:
+            logger.error("Error getting next project ID: %s", e)
+            return 1
+
+    @abstractmethod
+    async def reserve_task_ids(self, count: int) -> List[int]: ...
+
+    # Employees and authentication
+    @abstractmethod
+    async def add_employee(self, employee: Employee) -> bool: ...
+
+    @abstractmethod
+    async def _find_employee_by_email(self, email: str) -> Optional[Dict]:
+        """The stored employee document for ``email``, password hash included."""
+
+    @abstractmethod
+    async def _set_password_hash(self, employee_id: int, password_hash: bytes): ...
+
+    async def hash_password(self, password: str) -> bytes:
+        return await self.password_hasher.hash_async(password)
+
+    async def authenticate_employee(self, email: str, password: str) -> Optional[Dict]:
+        try:
+            employee_data = await self._find_employee_by_email(email)
+            if employee_data and await self.password_hasher.check_async(password, employee_data["password_hash"]):
+                if self.password_hasher.needs_rehash(employee_data["password_hash"]):
+                    await self._rehash_password(employee_data["employee_id"], password)
+                return self._login_result(employee_data)
             return None
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
-            print(f"Error authenticating employee: {e}")
+            logger.error("Error authenticating employee: %s", e)
             return None
 
+    async def _rehash_password(self, employee_id: int, password: str):
+        # Best effort: the login already succeeded, so a busy pool just defers the upgrade to the next login
+        try:
+            await self._set_password_hash(employee_id, await self.password_hasher.hash_async(password))
+        except PasswordHasherBusy:
+            pass
+
+    def _login_result(self, employee_data: Dict) -> Dict:
+        token = jwt.encode({
+            "employee_id": employee_data["employee_id"],
+            "email": employee_data["email"],
+            "role": employee_data["role"],
+            "exp": datetime.utcnow() + timedelta(hours=24)
+        }, self.SECRET_KEY, algorithm="HS256")
+
+        return {
+            "employee_id": employee_data["employee_id"],
+            "name": employee_data["name"],
+            "email": employee_data["email"],
+            "role": employee_data["role"],
+            "token": token
+        }
+
     def verify_token(self, token: str) -> Optional[Dict]:
+        # Pure CPU work with no I/O, so it stays synchronous.
+        digest = self.token_cache.digest(token)
+        if self.token_cache.is_revoked(digest):
+            return None
+        payload = self.token_cache.get(digest)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, self.SECRET_KEY, algorithms=["HS256"])
+            self.token_cache.put(digest, payload)
             return payload
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
 
-    def get_employee_by_id(self, employee_id: int) -> Optional[Dict]:
-        try:
-            employee = self.employees_collection.find_one({"employee_id": employee_id})
-            if employee:
-                employee.pop("password_hash", None)
-                employee.pop("_id", None)
-            return employee
-        except Exception as e:
-            print(f"Error getting employee: {e}")
-            return None
+    def revoke_token(self, token: str) -> bool:
+        payload = self.verify_token(token)
+        if payload is None:
+            return False
+        self.token_cache.revoke(self.token_cache.digest(token), payload.get("exp"))
+        return True
 
-    def get_all_employees(self) -> List[Dict]:
-        try:
-            employees = list(self.employees_collection.find({}, {"password_hash": 0, "_id": 0}))
-            return employees
-        except Exception as e:
-            print(f"Error getting employees: {e}")
-            return []
+    @abstractmethod
+    async def get_employee_by_id(self, employee_id: int) -> Optional[Dict]: ...
 
-    # Task Management
-    def add_task(self, task: Task) -> bool:
-        try:
-            if self.tasks_collection.find_one({"task_id": task.task_id}):
-                return False
-            
-            self.tasks_collection.insert_one(task.to_dict())
-            return True
-        except Exception as e:
-            print(f"Error adding task: {e}")
-            return False
+    @abstractmethod
+    async def get_all_employees(self, after: Optional[int] = None, limit: Optional[int] = None,
+                                fields: Optional[List[str]] = None) -> List[Dict]: ...
 
-    def get_task_by_id(self, task_id: int) -> Optional[Dict]:
-        try:
-            task = self.tasks_collection.find_one({"task_id": task_id}, {"_id": 0})
-            return task
-        except Exception as e:
-            print(f"Error getting task: {e}")
-            return None
+    # Tasks
+    @abstractmethod
+    async def add_task(self, task: Task) -> bool: ...
 
-    def get_tasks_by_employee(self, employee_id: int) -> List[Dict]:
-        try:
-            tasks = list(self.tasks_collection.find({"assigned_to": employee_id}, {"_id": 0}))
-            return tasks
-        except Exception as e:
-            print(f"Error getting tasks for employee: {e}")
-            return []
+    @abstractmethod
+    async def get_task_by_id(self, task_id: int, include_archived: bool = False) -> Optional[Dict]: ...
+
+    @abstractmethod
+    async def check_task_access(self, task_id: int, assignee: Optional[int] = None) -> TaskAccess: ...
 
-    def get_all_tasks(self) -> List[Dict]:
+    @abstractmethod
+    async def _find_tasks(self, query: Dict, after: Optional[int], limit: Optional[int],
+                          fields: Optional[List[str]], include_archived: bool = False) -> List[Dict]:
+        """Keyset-paginate tasks matching ``query`` by task_id; with include_archived, archived tasks merge in."""
+
+    async def get_tasks_by_employee(self, employee_id: int, after: Optional[int] = None, limit: Optional[int] = None,
+                                    fields: Optional[List[str]] = None, status: Optional[str] = None,
+                                    priority: Optional[str] = None, include_archived: bool = False) -> List[Dict]:
         try:
-            tasks = list(self.tasks_collection.find({}, {"_id": 0}))
-            return tasks
+            return await self._find_tasks(_task_filter(status, priority, employee_id), after, limit, fields,
+                                          include_archived)
         except Exception as e:
-            print(f"Error getting all tasks: {e}")
+            logger.error("Error getting tasks for employee: %s", e)
             return []
 
-    def update_task_status(self, task_id: int, status: str) -> bool:
+    async def get_all_tasks(self, after: Optional[int] = None, limit: Optional[int] = None,
+                            fields: Optional[List[str]] = None, status: Optional[str] = None,
+                            priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                            include_archived: bool = False) -> List[Dict]:
         try:
-            result = self.tasks_collection.update_one(
-                {"task_id": task_id},
-                {"$set": {"status": status, "updated_at": datetime.now().isoformat()}}
-            )
-            return result.modified_count > 0
+            return await self._find_tasks(_task_filter(status, priority, assigned_to), after, limit, fields,
+                                          include_archived)
         except Exception as e:
-            print(f"Error updating task status: {e}")
-            return False
+            logger.error("Error getting all tasks: %s", e)
+            return []
 
-    def add_time_log(self, task_id: int, employee_id: int, hours: float, description: str = "") -> bool:
+    async def get_tasks_without_project(self, after: Optional[int] = None, limit: Optional[int] = None,
+                                        fields: Optional[List[str]] = None, status: Optional[str] = None,
+                                        priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                                        include_archived: bool = False) -> List[Dict]:
         try:
-            time_log = {
-                "employee_id": employee_id,
-                "hours": hours,
-                "description": description,
-                "logged_at": datetime.now().isoformat()
-            }
-            
-            result = self.tasks_collection.update_one(
-                {"task_id": task_id},
-                {
-                    "$push": {"time_logs": time_log},
-                    "$set": {"updated_at": datetime.now().isoformat()}
-                }
-            )
-            return result.modified_count > 0
+            return await self._find_tasks({"project_id": None, **_task_filter(status, priority, assigned_to)},
+                                          after, limit, fields, include_archived)
         except Exception as e:
-            print(f"Error adding time log: {e}")
-            return False
+            logger.error("Error getting tasks without project: %s", e)
+            return []
 
-    def get_employee_time_logs(self, employee_id: int) -> List[Dict]:
+    async def get_tasks_by_project(self, project_id: int, after: Optional[int] = None, limit: Optional[int] = None,
+                                   fields: Optional[List[str]] = None, status: Optional[str] = None,
+                                   priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                                   include_archived: bool = False) -> List[Dict]:
         try:
-            tasks = self.tasks_collection.find(
-                {"time_logs.employee_id": employee_id},
-                {"task_id": 1, "title": 1, "time_logs": 1, "_id": 0}
-            )
-            
-            employee_logs = []
-            for task in tasks:
-                for log in task.get("time_logs", []):
-                    if log["employee_id"] == employee_id:
-                        log["task_id"] = task["task_id"]
-                        log["task_title"] = task["title"]
-                        employee_logs.append(log)
-            
-            return employee_logs
+            return await self._find_tasks({"project_id": project_id, **_task_filter(status, priority, assigned_to)},
+                                          after, limit, fields, include_archived)
         except Exception as e:
-            print(f"Error getting employee time logs: {e}")
+            logger.error("Error getting tasks for project: %s", e)
             return []
 
-    # Project Management
-    def add_project(self, project: Project) -> bool:
-        try:
-            if self.projects_collection.find_one({"project_id": project.project_id}):
-                return False
-            
-            self.projects_collection.insert_one(project.to_dict())
-            return True
-        except Exception as e:
-            print(f"Error adding project: {e}")
-            return False
+    @abstractmethod
+    async def search_tasks(self, text: str, skip: int = 0, limit: Optional[int] = None,
+                           fields: Optional[List[str]] = None, status: Optional[str] = None,
+                           priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                           project_id: Optional[int] = None) -> List[Dict]: ...
 
-    def get_project_by_id(self, project_id: int) -> Optional[Dict]:
-        try:
-            project = self.projects_collection.find_one({"project_id": project_id}, {"_id": 0})
-            return project
-        except Exception as e:
-            print(f"Error getting project: {e}")
-            return None
+    @abstractmethod
+    async def _guarded_task_update(self, task_id: int, fields: Dict[str, Any], assignee: Optional[int] = None,
+                                   increments: Optional[Dict[str, float]] = None) -> Tuple[TaskAccess, Optional[Dict]]:
+        """Apply ``fields`` to a task in one step, honouring the assignee check.
 
-    def get_all_projects(self) -> List[Dict]:
-        try:
-            projects = list(self.projects_collection.find({}, {"_id": 0}))
-            return projects
-        except Exception as e:
-            print(f"Error getting all projects: {e}")
-            return []
+        Returns the access outcome and the task's assigned_to, project_id,
+        status and total_hours as they were before the update.
+        """
 
-    def get_tasks_by_project(self, project_id: int) -> List[Dict]:
-        try:
-            tasks = list(self.tasks_collection.find({"project_id": project_id}, {"_id": 0}))
-            return tasks
-        except Exception as e:
-            print(f"Error getting tasks for project: {e}")
-            return []
+    @abstractmethod
+    async def _move_project_hours(self, task_id: int, old_project_id: Optional[int],
+                                  new_project_id: Optional[int], hours: float):
+        """Reattribute a task's logged hours after it moved from one project to another."""
+
+    @abstractmethod
+    async def _archived_task_ids(self, task_ids: List[int]) -> set:
+        """Those of ``task_ids`` that were moved to the archive."""
 
-    def update_task_project(self, task_id: int, project_id: Optional[int]) -> bool:
+    async def _mark_archived(self, task_ids: List[int], access: List[TaskAccess]) -> List[TaskAccess]:
+        """Report NOT_FOUND as ARCHIVED for tasks that are in the archive, so writes to them can be told apart."""
+        missing = [task_id for task_id, outcome in zip(task_ids, access) if outcome is TaskAccess.NOT_FOUND]
+        archived = await self._archived_task_ids(missing) if missing else set()
+        return [TaskAccess.ARCHIVED if outcome is TaskAccess.NOT_FOUND and task_id in archived else outcome
+                for task_id, outcome in zip(task_ids, access)]
+
+    async def _check_archived(self, task_id: int, access: TaskAccess) -> TaskAccess:
+        return (await self._mark_archived([task_id], [access]))[0]
+
+    async def update_task_status(self, task_id: int, status: str, assignee: Optional[int] = None) -> TaskAccess:
         try:
-            result = self.tasks_collection.update_one(
-                {"task_id": task_id},
-                {"$set": {"project_id": project_id, "updated_at": datetime.now().isoformat()}}
+            access, before = await self._guarded_task_update(
+                task_id, _status_fields(status, datetime.now().isoformat()), assignee
             )
-            return result.modified_count > 0
+            if access:
+                self._publish_status_change(task_id, before, status)
+            return await self._check_archived(task_id, access)
         except Exception as e:
-            print(f"Error updating task project: {e}")
-            return False
+            logger.error("Error updating task status: %s", e)
+            return TaskAccess.ERROR
 
-    def get_tasks_without_project(self) -> List[Dict]:
+    async def update_task_project(self, task_id: int, project_id: Optional[int]) -> TaskAccess:
         try:
-            tasks = list(self.tasks_collection.find(
-                {"$or": [{"project_id": None}, {"project_id": {"$exists": False}}]},
-                {"_id": 0}
-            ))
-            return tasks
+            project = await self.get_project_by_id(project_id) if project_id is not None else None
+            access, before = await self._guarded_task_update(task_id, {
+                "project_id": project_id,
+                "project_name": project["name"] if project else None,
+                "updated_at": datetime.now().isoformat()
+            })
+            if access:
+                await self._move_project_hours(task_id, before.get("project_id"), project_id,
+                                               before.get("total_hours", 0))
+                self._publish_project_change(task_id, before, project_id)
+            return await self._check_archived(task_id, access)
         except Exception as e:
-            print(f"Error getting tasks without project: {e}")
-            return []
+            logger.error("Error updating task project: %s", e)
+            return TaskAccess.ERROR
 
-    def get_next_project_id(self) -> int:
-        try:
-            last_project = self.projects_collection.find_one({}, sort=[("project_id", -1)])
-            return (last_project["project_id"] + 1) if last_project else 1
-        except Exception as e:
-            print(f"Error getting next project ID: {e}")
-            return 1
+    # Time logs and hours
+    @abstractmethod
+    async def add_time_log(self, task_id: int, employee_id: int, hours: float, description: str = "",
+                           assignee: Optional[int] = None, log_id: Optional[str] = None) -> TaskAccess:
+        """Store one time log and add its hours to the task and the hour rollups.
 
-    def get_next_task_id(self) -> int:
-        try:
-            last_task = self.tasks_collection.find_one({}, sort=[("task_id", -1)])
-            return (last_task["task_id"] + 1) if last_task else 1
-        except Exception as e:
-            print(f"Error getting next task ID: {e}")
-            return 1
+        ``log_id`` identifies the log so a client can retry: sending a log
+        that is already stored returns OK without counting its hours again.
+        A log id reused for a different task or employee is an ERROR.
+        """
 
-    def get_next_employee_id(self) -> int:
-        try:
-            last_employee = self.employees_collection.find_one({}, sort=[("employee_id", -1)])
-            return (last_employee["employee_id"] + 1) if last_employee else 1
-        except Exception as e:
-            print(f"Error getting next employee ID: {e}")
-            return 1
+    @abstractmethod
+    async def get_hours(self, employee_id: Optional[int] = None, project_id: Optional[int] = None) -> float: ...
 
-    # Dashboard Analytics
-    def get_dashboard_stats(self, employee_id: Optional[int] = None) -> Dict:
-        try:
-            if employee_id:
-                # Employee-specific stats
-                tasks = self.get_tasks_by_employee(employee_id)
-                time_logs = self.get_employee_time_logs(employee_id)
-            else:
-                # Manager stats (all tasks)
-                tasks = self.get_all_tasks()
-                time_logs = []
-                for task in tasks:
-                    time_logs.extend(task.get("time_logs", []))
-
-            total_tasks = len(tasks)
-            completed_tasks = len([t for t in tasks if t["status"] == "Completed"])
-            pending_tasks = len([t for t in tasks if t["status"] == "Pending"])
-            in_progress_tasks = len([t for t in tasks if t["status"] == "In Progress"])
-            total_hours = sum(log["hours"] for log in time_logs)
-
-            # Priority breakdown
-            high_priority = len([t for t in tasks if t["priority"] == "High"])
-            medium_priority = len([t for t in tasks if t["priority"] == "Medium"])
-            low_priority = len([t for t in tasks if t["priority"] == "Low"])
-
-            return {
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
-                "pending_tasks": pending_tasks,
-                "in_progress_tasks": in_progress_tasks,
-                "total_hours": round(total_hours, 2),
-                "completion_rate": round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 1),
-                "priority_breakdown": {
-                    "high": high_priority,
-                    "medium": medium_priority,
-                    "low": low_priority
-                }
-            }
+    @abstractmethod
+    async def get_task_time_logs(self, task_id: int, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None) -> List[Dict]: ...
+
+    @abstractmethod
+    async def get_task_time_logs_for(self, task_id: int, assignee: Optional[int] = None,
+                                     start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None,
+                                     include_archived: bool = False) -> Tuple[TaskAccess, List[Dict]]: ...
+
+    @abstractmethod
+    async def get_employee_time_logs(self, employee_id: int, start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None) -> List[Dict]: ...
+
+    # Projects
+    @abstractmethod
+    async def add_project(self, project: Project) -> bool: ...
+
+    @abstractmethod
+    async def get_project_by_id(self, project_id: int) -> Optional[Dict]: ...
+
+    @abstractmethod
+    async def get_all_projects(self, after: Optional[int] = None, limit: Optional[int] = None,
+                               fields: Optional[List[str]] = None) -> List[Dict]: ...
+
+    # Bulk operations
+    @abstractmethod
+    async def add_tasks(self, tasks: List[Task]) -> List[Dict]: ...
+
+    @abstractmethod
+    async def update_task_statuses(self, updates: List[Dict], assignee: Optional[int] = None) -> List[Dict]: ...
+
+    @abstractmethod
+    async def add_time_logs(self, entries: List[Dict], assignee: Optional[int] = None) -> List[Dict]: ...
+
+    # Reporting, dashboard and export
+    def cache_stats(self) -> Dict:
+        return {"token_cache": self.token_cache.verified.stats()}
+
+    @abstractmethod
+    async def get_hours_report(self, start: date, end: date, period: str = "day",
+                               group_by: Optional[List[str]] = None, employee_id: Optional[int] = None,
+                               project_id: Optional[int] = None) -> List[Dict]: ...
+
+    @abstractmethod
+    async def get_dashboard_stats(self, employee_id: Optional[int] = None) -> Dict: ...
+
+    async def get_dashboard(self, employee_id: Optional[int] = None, task_after: Optional[int] = None,
+                            task_limit: Optional[int] = None, task_fields: Optional[List[str]] = None,
+                            project_limit: Optional[int] = None,
+                            project_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Stats, a page of tasks and project summaries for one dashboard render.
+
+        Tasks are scoped to employee_id when given, otherwise all tasks are
+        listed. The three parts are independent, so their queries run
+        concurrently, and each falls back to its own empty result on error.
+        """
+        if employee_id:
+            tasks = self.get_tasks_by_employee(employee_id, task_after, task_limit, task_fields)
+        else:
+            tasks = self.get_all_tasks(task_after, task_limit, task_fields)
+        stats, tasks, projects = await asyncio.gather(
+            self.get_dashboard_stats(employee_id), tasks,
+            self.get_all_projects(None, project_limit, project_fields)
+        )
+        return {"stats": stats, "tasks": tasks, "projects": projects}
+
+    # Export generators yield lists of documents and are async generators
+    @abstractmethod
+    def iter_tasks(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   project_id: Optional[int] = None, batch_size: int = 1000, include_archived: bool = False): ...
+
+    @abstractmethod
+    def iter_time_logs(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       project_id: Optional[int] = None, batch_size: int = 1000): ...
+
+    @abstractmethod
+    def iter_employees(self, batch_size: int = 1000): ...
+
+
+@instrumented
+class AsyncTaskManager(TaskStore):
+    """MongoDB TaskStore built on Motor.
+
+    Every storage method is a coroutine, so the FastAPI handlers await
+    database round trips instead of blocking the event loop. The maintenance
+    CLI and benchmarks drive it through the blocking TaskManager facade.
+    """
+
+    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/", db_name: str = "employee_management",
+                 id_block_size: int = 1, password_hasher: Optional[PasswordHasher] = None,
+                 cache: Optional[TTLCache] = None, events: Optional[DashboardEvents] = None,
+                 slow_query_ms: Optional[float] = None, client_options: Optional[Dict[str, Any]] = None,
+                 read_preference: str = "primary", measure_reply_bytes: bool = False, connect: bool = True):
+        super().__init__(password_hasher, events)
+        self.mongo_uri = mongo_uri
+        self.db_name = db_name
+        self.client_options = client_options or {}
+        self.read_preference = read_preference
+        self.command_metrics = MongoCommandMetrics(slow_query_ms, measure_reply_bytes)
+        self.pool_monitor = PoolMonitor()
+        # Read-through cache for rarely changing reads (employee profiles, projects).
+        # Any object with TTLCache's get/set/delete/delete_prefix/stats methods can be plugged in.
+        self.cache = cache if cache is not None else TTLCache(maxsize=1024, ttl=60)
+        # Ids reserved from the counters collection but not handed out yet,
+        # as counter name -> [next id, last id of the block].
+        self.id_block_size = id_block_size
+        self._id_blocks = {}
+        self._id_lock = asyncio.Lock()
+        # Pass connect=False to create the client later, e.g. in each worker's lifespan hook
+        # rather than at import time in a process that is about to fork.
+        if connect:
+            self.connect()
+
+    def connect(self):
+        """Create the MongoDB client and collection handles.
+
+        ``client_options`` are passed to MongoClient (pool sizes, timeouts,
+        compressors). List, report and export reads go through ``self.reads``,
+        which uses ``read_preference`` so they can be served by secondaries;
+        everything else reads from the primary.
+        """
+        self.client = AsyncIOMotorClient(self.mongo_uri, event_listeners=[self.command_metrics, self.pool_monitor],
+                                         **self.client_options)
+        self.db = self.client[self.db_name]
+        self.reads = self.client.get_database(self.db_name, read_preference=READ_PREFERENCES[self.read_preference])
+        self.employees_collection = self.db.employees
+        self.tasks_collection = self.db.tasks
+        self.tasks_archive_collection = self.db.tasks_archive
+        self.archive_totals_collection = self.db.archive_totals
+        self.projects_collection = self.db.projects
+        self.counters_collection = self.db.counters
+        self.time_logs_collection = self.db.time_logs
+        self.hour_totals_collection = self.db.hour_totals
+        self.daily_hours_collection = self.db.daily_hours
+        self.leases_collection = self.db.leases
+
+    def close(self):
+        self.client.close()
+
+    async def ping(self) -> bool:
+        try:
+            await self.client.admin.command("ping")
+            return True
+        except Exception as e:
+            logger.error("Error pinging MongoDB: %s", e)
+            return False
+
+    def pool_stats(self) -> Dict:
+        return self.pool_monitor.stats(self.client.options.pool_options.max_pool_size)
+
+    # Index Management
+    async def ensure_indexes(self) -> bool:
+        """Create INDEXES, refusing to when stored data would break a unique index.
+
+        Duplicates found by find_duplicate_keys are reported one by one and
+        nothing is built, so they can be cleaned up before the next start.
+        """
+        try:
+            duplicates = await self.find_duplicate_keys()
+            for duplicate in duplicates:
+                logger.error("Error ensuring indexes: %d documents in %s share %s, which breaks unique index %s",
+                             duplicate["count"], duplicate["collection"], duplicate["key"], duplicate["index"])
+            if duplicates:
+                return False
+            for collection_name, indexes in INDEXES.items():
+                await self.db[collection_name].create_indexes(indexes)
+            return True
         except Exception as e:
-            print(f"Error getting dashboard stats: {e}")
+            logger.error("Error ensuring indexes: %s", e)
+            return False
+
+    async def find_duplicate_keys(self, limit: int = 100) -> List[Dict]:
+        """Report stored values that would break a unique index in INDEXES that is not built yet.
+
+        Databases written before the unique indexes existed can hold the same
+        email or id twice, and create_indexes then fails. Each report names
+        the collection, the index, the duplicated key and how many documents
+        share it (at most ``limit`` per index). Indexes that already exist
+        enforce uniqueness, so they are not checked again.
+        """
+        reports = []
+        for collection_name, indexes in INDEXES.items():
+            collection = self.db[collection_name]
+            existing = await collection.index_information()
+            for index in indexes:
+                spec = index.document
+                if not spec.get("unique") or spec["name"] in existing:
+                    continue
+                fields = list(spec["key"])
+                pipeline = [{"$match": {field: {"$exists": True} for field in fields}}] if spec.get("sparse") else []
+                pipeline += [
+                    {"$group": {"_id": {field: f"${field}" for field in fields}, "count": {"$sum": 1}}},
+                    {"$match": {"count": {"$gt": 1}}},
+                    {"$limit": limit}
+                ]
+                async for row in collection.aggregate(pipeline, allowDiskUse=True):
+                    reports.append({"collection": collection_name, "index": spec["name"],
+                                    "key": row["_id"], "count": row["count"]})
+        return reports
+
+    async def explain_queries(self) -> List[Dict]:
+        """Run explain() on every entry of QUERY_SHAPES and report the plans.
+
+        Each report carries the winning plan's stages and a ``collscan`` flag
+        that is set when the query falls back to a full collection scan.
+        """
+        reports = []
+        for collection_name, query, sort in QUERY_SHAPES:
+            cursor = self.db[collection_name].find(query).limit(1)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+            stages = _plan_stages(plan)
+            reports.append({
+                "collection": collection_name,
+                "query": query,
+                "sort": sort,
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages
+            })
+        return reports
+
+    # Id Allocation
+    async def seed_counters(self) -> bool:
+        """Make sure no counter is behind the highest id already stored.
+
+        Keeps allocation correct for databases populated before the counters
+        collection existed. $max makes this safe to run on every startup.
+        """
+        try:
+            for counter, collection_name in COUNTERS.items():
+                last = await self.db[collection_name].find_one({}, {counter: 1}, sort=[(counter, -1)])
+                if last:
+                    await self.counters_collection.update_one(
+                        {"_id": counter}, {"$max": {"seq": last[counter]}}, upsert=True
+                    )
+            return True
+        except Exception as e:
+            logger.error("Error seeding counters: %s", e)
+            return False
+
+    async def _allocate_id(self, counter: str) -> int:
+        """Hand out the next id for a counter with a single atomic $inc.
+
+        With id_block_size > 1 the increment reserves a whole block of ids and
+        later calls are served from memory until the block is used up. Ids left
+        in a block when the process exits are skipped, never reused.
+        """
+        async with self._id_lock:
+            block = self._id_blocks.get(counter)
+            if block is None or block[0] > block[1]:
+                result = await self.counters_collection.find_one_and_update(
+                    {"_id": counter},
+                    {"$inc": {"seq": self.id_block_size}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                block = [result["seq"] - self.id_block_size + 1, result["seq"]]
+                self._id_blocks[counter] = block
+            next_id = block[0]
+            block[0] += 1
+            return next_id
+
+    async def _find_page(self, collection, query: Dict, key: str, after: Optional[int], limit: Optional[int],
+                         projection: Dict) -> List[Dict]:
+        """Run a keyset-paginated find ordered by ``key``, resuming after ``after``."""
+        if after is not None:
+            query = {**query, key: {"$gt": after}}
+        cursor = collection.find(query, projection).sort(key, ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def _find_tasks(self, query: Dict, after: Optional[int], limit: Optional[int],
+                          fields: Optional[List[str]], include_archived: bool = False) -> List[Dict]:
+        projection = _projection(fields, TASK_FIELDS, "task_id", TASK_LIST_PROJECTION)
+        if not include_archived:
+            return await self._find_page(self.reads.tasks, query, "task_id", after, limit, projection)
+        tasks, archived = await asyncio.gather(
+            self._find_page(self.reads.tasks, query, "task_id", after, limit, projection),
+            self._find_page(self.reads.tasks_archive, query, "task_id", after, limit, projection)
+        )
+        return sorted(tasks + archived, key=lambda task: task["task_id"])[:limit or None]
+
+    async def reserve_task_ids(self, count: int) -> List[int]:
+        """Reserve ``count`` consecutive task ids with a single $inc, for bulk creates."""
+        result = await self.counters_collection.find_one_and_update(
+            {"_id": "task_id"},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return list(range(result["seq"] - count + 1, result["seq"] + 1))
+
+    # Employee Management
+    async def add_employee(self, employee: Employee) -> bool:
+        try:
+            employee_data = employee.to_dict()
+            employee_data["password_hash"] = employee.password_hash
+            await self.employees_collection.insert_one(employee_data)
+            self.cache.delete(("employee", employee.employee_id))
+            return True
+        except DuplicateKeyError:
+            return False
+        except Exception as e:
+            logger.error("Error adding employee: %s", e)
+            return False
+
+    async def _find_employee_by_email(self, email: str) -> Optional[Dict]:
+        return await self.employees_collection.find_one({"email": email})
+
+    async def _set_password_hash(self, employee_id: int, password_hash: bytes):
+        await self.employees_collection.update_one(
+            {"employee_id": employee_id}, {"$set": {"password_hash": password_hash}}
+        )
+
+    async def get_employee_by_id(self, employee_id: int) -> Optional[Dict]:
+        try:
+            key = ("employee", employee_id)
+            employee = self.cache.get(key)
+            if employee is not None:
+                return dict(employee)
+
+            employee = await self.employees_collection.find_one(
+                {"employee_id": employee_id}, {"password_hash": 0, "_id": 0}
+            )
+            if employee:
+                self.cache.set(key, dict(employee))
+            return employee
+        except Exception as e:
+            logger.error("Error getting employee: %s", e)
+            return None
+
+    async def get_all_employees(self, after: Optional[int] = None, limit: Optional[int] = None,
+                                fields: Optional[List[str]] = None) -> List[Dict]:
+        try:
+            employees = await self._find_page(
+                self.reads.employees, {}, "employee_id", after, limit,
+                _projection(fields, EMPLOYEE_FIELDS, "employee_id", {"password_hash": 0, "_id": 0})
+            )
+            return employees
+        except Exception as e:
+            logger.error("Error getting employees: %s", e)
+            return []
+
+    # Task Management
+    async def _task_documents(self, tasks: List[Task]) -> List[Dict]:
+        """Task documents with their project's name copied in, so task search can match on it."""
+        project_ids = list({task.project_id for task in tasks if task.project_id is not None})
+        names = {}
+        if project_ids:
+            async for project in self.projects_collection.find({"project_id": {"$in": project_ids}},
+                                                               {"_id": 0, "project_id": 1, "name": 1}):
+                names[project["project_id"]] = project["name"]
+        return [{**task.to_dict(), "project_name": names.get(task.project_id)} for task in tasks]
+
+    async def add_task(self, task: Task) -> bool:
+        try:
+            await self.tasks_collection.insert_one((await self._task_documents([task]))[0])
+            self._publish_task_added(task)
+            return True
+        except DuplicateKeyError:
+            return False
+        except Exception as e:
+            logger.error("Error adding task: %s", e)
+            return False
+
+    async def get_task_by_id(self, task_id: int, include_archived: bool = False) -> Optional[Dict]:
+        try:
+            task = await self.tasks_collection.find_one({"task_id": task_id}, {"_id": 0})
+            if task is None and include_archived:
+                task = await self.tasks_archive_collection.find_one({"task_id": task_id}, {"_id": 0})
+            return task
+        except Exception as e:
+            logger.error("Error getting task: %s", e)
+            return None
+
+    async def check_task_access(self, task_id: int, assignee: Optional[int] = None) -> TaskAccess:
+        try:
+            task = await self.tasks_collection.find_one({"task_id": task_id}, {"_id": 0, "assigned_to": 1})
+            return await self._check_archived(task_id, _task_access(task, assignee))
+        except Exception as e:
+            logger.error("Error checking task access: %s", e)
+            return TaskAccess.ERROR
+
+    async def _guarded_task_update(self, task_id: int, fields: Dict[str, Any], assignee: Optional[int] = None,
+                                   increments: Optional[Dict[str, float]] = None) -> Tuple[TaskAccess, Optional[Dict]]:
+        before = await self.tasks_collection.find_one_and_update(
+            {"task_id": task_id},
+            _guarded_set(fields, assignee, increments),
+            projection={"_id": 0, "assigned_to": 1, "project_id": 1, "status": 1, "total_hours": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        return _task_access(before, assignee), before
+
+    async def _archived_task_ids(self, task_ids: List[int]) -> set:
+        return set(await self.tasks_archive_collection.distinct("task_id", {"task_id": {"$in": task_ids}}))
+
+    async def search_tasks(self, text: str, skip: int = 0, limit: Optional[int] = None,
+                           fields: Optional[List[str]] = None, status: Optional[str] = None,
+                           priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                           project_id: Optional[int] = None) -> List[Dict]:
+        """Full-text search over task titles, descriptions and project names, best match first.
+
+        ``text`` uses MongoDB $text syntax (words, "quoted phrases",
+        -excluded words). Each result carries its relevance ``score``. Pages
+        are addressed by ``skip`` since ranked results have no stable key.
+        """
+        try:
+            projection = {**_projection(fields, TASK_FIELDS, "task_id", TASK_LIST_PROJECTION), "score": SEARCH_SCORE}
+            cursor = self.reads.tasks.find(
+                _search_query(text, status, priority, assigned_to, project_id), projection
+            ).sort(SEARCH_SORT).skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error("Error searching tasks: %s", e)
+            return []
+
+    async def add_time_log(self, task_id: int, employee_id: int, hours: float, description: str = "",
+                           assignee: Optional[int] = None, log_id: Optional[str] = None) -> TaskAccess:
+        """Store the log, then count its hours with _count_time_logs: two round trips.
+
+        The task lookup and the insert of the marked log go out together, and
+        a log the caller may not write is deleted again. Nothing is counted
+        unless the log is stored, and a failed counter write leaves the log
+        marked for count_pending_time_logs instead of failing the call.
+        """
+        try:
+            log = {
+                "log_id": log_id or _new_log_id(),
+                "task_id": task_id,
+                "employee_id": employee_id,
+                "hours": hours,
+                "description": description,
+                "logged_at": datetime.now().isoformat()
+            }
+            task, inserted = await asyncio.gather(
+                self.tasks_collection.find_one({"task_id": task_id}, {"_id": 0, "assigned_to": 1, "project_id": 1}),
+                self.time_logs_collection.insert_one({**log, "uncounted": TIME_LOG_COUNTERS, "access_scope": assignee}),
+                return_exceptions=True
+            )
+            if isinstance(task, Exception):
+                raise task
+            access = _task_access(task, assignee)
+            if not access:
+                if not isinstance(inserted, Exception):
+                    await self.time_logs_collection.delete_one({"log_id": log["log_id"]})
+                return await self._check_archived(task_id, access)
+            if isinstance(inserted, DuplicateKeyError):
+                # A retry of a stored log; its hours were counted (or are pending) already
+                return TaskAccess.OK if await self._stored_retries([(0, log)]) else TaskAccess.ERROR
+            if isinstance(inserted, Exception):
+                raise inserted
+            await self._count_time_logs([{**log, "project_id": task.get("project_id")}])
+            self._publish_time_logged(log, task.get("assigned_to"))
+            return TaskAccess.OK
+        except Exception as e:
+            logger.error("Error adding time log: %s", e)
+            return TaskAccess.ERROR
+
+    async def _stored_retries(self, candidates: List[Tuple[int, Dict]]) -> set:
+        """Positions of the (position, log) pairs whose log_id is stored for the same task and employee."""
+        if not candidates:
+            return set()
+        stored = {
+            log["log_id"]: log for log in await self.time_logs_collection.find(
+                {"log_id": {"$in": [log["log_id"] for _, log in candidates]}},
+                {"_id": 0, "log_id": 1, "task_id": 1, "employee_id": 1}
+            ).to_list(length=None)
+        }
+        return {
+            position for position, log in candidates
+            if log["log_id"] in stored and (stored[log["log_id"]]["task_id"], stored[log["log_id"]]["employee_id"])
+            == (log["task_id"], log["employee_id"])
+        }
+
+    async def _count_time_logs(self, logs: List[Dict], counters: List[str] = TIME_LOG_COUNTERS):
+        """Add stored logs (with project_id) to their tasks' total_hours and the hour rollups.
+
+        The counter writes and clearing the logs' marker go out together in one
+        round trip. If any of them fails, the marker is set to exactly the
+        counters that failed, for count_pending_time_logs to apply later. A log
+        is counted twice only if clearing its marker and that follow-up write
+        both fail after its counters went through; the failure is reported.
+        """
+        log_ids = [log["log_id"] for log in logs]
+        writes = {
+            "marker": self.time_logs_collection.update_many(
+                {"log_id": {"$in": log_ids}}, {"$unset": {"uncounted": "", "access_scope": ""}}
+            )
+        }
+        if "task_hours" in counters:
+            task_hours = defaultdict(float)
+            for log in logs:
+                task_hours[log["task_id"]] += log["hours"]
+            now = datetime.now().isoformat()
+            writes["task_hours"] = self.tasks_collection.bulk_write([
+                UpdateOne({"task_id": task_id}, {"$inc": {"total_hours": hours}, "$set": {"updated_at": now}})
+                for task_id, hours in task_hours.items()
+            ], ordered=False)
+        if "rollups" in counters:
+            writes["rollups"] = self._record_hours(logs)
+        results = await asyncio.gather(*writes.values(), return_exceptions=True)
+        failed = {name: result for name, result in zip(writes, results) if isinstance(result, Exception)}
+        if not failed:
+            return
+        for name, error in failed.items():
+            logger.error("Error counting hours of %d time logs (%s), left for count_pending_time_logs: %s",
+                         len(logs), name, error)
+        owed = [counter for counter in counters if counter in failed]
+        try:
+            await self.time_logs_collection.update_many(
+                {"log_id": {"$in": log_ids}},
+                {"$set": {"uncounted": owed}} if owed else {"$unset": {"uncounted": "", "access_scope": ""}}
+            )
+        except Exception as e:
+            logger.error("Error marking time logs uncounted: %s", e)
+
+    async def _record_hours(self, logs: List[Dict]):
+        """Fold newly written time logs into the hour_totals counters and daily_hours buckets."""
+        if logs:
+            await asyncio.gather(
+                self.hour_totals_collection.bulk_write(_hour_total_updates(logs), ordered=False),
+                self.daily_hours_collection.bulk_write(_daily_hours_updates(logs), ordered=False)
+            )
+
+    async def _move_project_hours(self, task_id: int, old_project_id: Optional[int],
+                                  new_project_id: Optional[int], hours: float):
+        moves = _project_move_updates(old_project_id, new_project_id, hours)
+        if not moves:
+            return
+        rows = await self.time_logs_collection.aggregate(_task_daily_hours_pipeline(task_id)).to_list(length=None)
+        logs = [{**row["_id"], "hours": row["hours"], "entries": row["entries"]} for row in rows]
+        await asyncio.gather(
+            self.hour_totals_collection.bulk_write(moves, ordered=False),
+            self.daily_hours_collection.bulk_write(
+                _daily_hours_updates([{**log, "project_id": old_project_id} for log in logs], sign=-1)
+                + _daily_hours_updates([{**log, "project_id": new_project_id} for log in logs]),
+                ordered=False
+            )
+        )
+
+    async def get_hours(self, employee_id: Optional[int] = None, project_id: Optional[int] = None) -> float:
+        """Read one hour_totals counter: the grand total, or an employee's or project's hours."""
+        try:
+            counter = await self.reads.hour_totals.find_one({"_id": _hours_key(employee_id, project_id)})
+            return counter["hours"] if counter else 0
+        except Exception as e:
+            logger.error("Error getting hours: %s", e)
+            return 0
+
+    async def get_task_time_logs(self, task_id: int, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None) -> List[Dict]:
+        try:
+            logs = await self.reads.time_logs.find(
+                {"task_id": task_id, **_date_range_filter("logged_at", start, end)},
+                TIME_LOG_PROJECTION,
+                sort=[("logged_at", ASCENDING)]
+            ).to_list(length=None)
+            return logs
+        except Exception as e:
+            logger.error("Error getting task time logs: %s", e)
+            return []
+
+    async def get_task_time_logs_for(self, task_id: int, assignee: Optional[int] = None,
+                                     start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None,
+                                     include_archived: bool = False) -> Tuple[TaskAccess, List[Dict]]:
+        try:
+            pipeline = _task_time_logs_pipeline(task_id, assignee, start, end)
+            result = await self.reads.tasks.aggregate(pipeline).to_list(length=1)
+            if not result and include_archived:
+                result = await self.reads.tasks_archive.aggregate(pipeline).to_list(length=1)
+            task = result[0] if result else None
+            access = _task_access(task, assignee)
+            return access, (task["time_logs"] if access else [])
+        except Exception as e:
+            logger.error("Error getting task time logs: %s", e)
+            return TaskAccess.ERROR, []
+
+    async def get_employee_time_logs(self, employee_id: int, start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None) -> List[Dict]:
+        try:
+            employee_logs = await self.reads.time_logs.find(
+                {"employee_id": employee_id, **_date_range_filter("logged_at", start, end)},
+                TIME_LOG_PROJECTION,
+                sort=[("logged_at", ASCENDING)]
+            ).to_list(length=None)
+
+            task_ids = list({log["task_id"] for log in employee_logs})
+            titles = {}
+            async for task in self.reads.tasks.find({"task_id": {"$in": task_ids}}, {"task_id": 1, "title": 1}):
+                titles[task["task_id"]] = task["title"]
+            # Logs stay in place when their task is archived
+            missing = [task_id for task_id in task_ids if task_id not in titles]
+            if missing:
+                async for task in self.reads.tasks_archive.find({"task_id": {"$in": missing}},
+                                                                {"task_id": 1, "title": 1}):
+                    titles[task["task_id"]] = task["title"]
+            for log in employee_logs:
+                log["task_title"] = titles.get(log["task_id"])
+
+            return employee_logs
+        except Exception as e:
+            logger.error("Error getting employee time logs: %s", e)
+            return []
+
+    # Maintenance
+    async def migrate_time_logs(self) -> int:
+        """Move time logs embedded in task documents into the time_logs collection.
+
+        Each log is upserted on a log_id derived from its task, position and
+        contents, which the unique log_id index backs, so an interrupted run
+        can simply be repeated. Only newly inserted logs are folded into the
+        hour_totals counters and daily_hours buckets, and the task's total_hours
+        is set from its logs in the same update that drops the embedded array,
+        so the hours show up without running reconcile-hours. Returns the number
+        of logs moved.
+        """
+        migrated = 0
+        async for task in self.tasks_collection.find({"time_logs": {"$exists": True}},
+                                                     {"task_id": 1, "project_id": 1, "time_logs": 1}):
+            logs, requests = [], []
+            for position, log in enumerate(task["time_logs"]):
+                stored = {
+                    "log_id": _migrated_log_id(task["task_id"], position, log),
+                    "task_id": task["task_id"],
+                    "employee_id": log["employee_id"],
+                    "hours": log["hours"],
+                    "description": log.get("description", ""),
+                    "logged_at": log["logged_at"]
+                }
+                logs.append({**stored, "project_id": task.get("project_id")})
+                requests.append(ReplaceOne({"log_id": stored["log_id"]}, stored, upsert=True))
+            if requests:
+                result = await self.time_logs_collection.bulk_write(requests, ordered=False)
+                await self._record_hours([logs[index] for index in result.upserted_ids])
+            totals = await self.time_logs_collection.aggregate([
+                {"$match": {"task_id": task["task_id"]}},
+                {"$group": {"_id": None, "hours": {"$sum": "$hours"}}}
+            ]).to_list(length=1)
+            await self.tasks_collection.update_one({"_id": task["_id"]}, {
+                "$set": {"total_hours": totals[0]["hours"] if totals else 0}, "$unset": {"time_logs": ""}
+            })
+            migrated += len(requests)
+        return migrated
+
+    async def backfill_project_names(self) -> int:
+        """Copy project names onto tasks written before task search existed; returns the number of tasks updated."""
+        updated = 0
+        async for project in self.projects_collection.find({}, {"_id": 0, "project_id": 1, "name": 1}):
+            for collection in (self.tasks_collection, self.tasks_archive_collection):
+                result = await collection.update_many(
+                    {"project_id": project["project_id"], "project_name": {"$ne": project["name"]}},
+                    {"$set": {"project_name": project["name"]}}
+                )
+                updated += result.modified_count
+        return updated
+
+    async def count_pending_time_logs(self, older_than_seconds: int = 300) -> int:
+        """Apply the counters still owed by time logs whose counting failed or was cut short.
+
+        Only logs stored more than ``older_than_seconds`` ago are taken, so
+        logs still being counted by the call that wrote them are left alone.
+        Each log is claimed by clearing its marker before it is counted, so
+        concurrent runs never count it twice. Returns the number of logs
+        counted.
+        """
+        cutoff = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(seconds=older_than_seconds))
+        pending = defaultdict(list)
+        async for log in self.time_logs_collection.find({"uncounted": {"$exists": True}, "_id": {"$lt": cutoff}},
+                                                        {"_id": 1}):
+            claimed = await self.time_logs_collection.find_one_and_update(
+                {"_id": log["_id"], "uncounted": {"$exists": True}}, {"$unset": {"uncounted": ""}},
+                projection={"_id": 0}, return_document=ReturnDocument.BEFORE
+            )
+            if claimed:
+                pending[tuple(claimed.pop("uncounted"))].append(claimed)
+        counted = 0
+        for counters, logs in pending.items():
+            tasks = await self._tasks_for_items(logs)
+            # A log still carrying access_scope never finished its access check; repeat it
+            rejected = {
+                log["log_id"] for log in logs
+                if "access_scope" in log and not _task_access(tasks.get(log["task_id"]), log["access_scope"])
+            }
+            if rejected:
+                await self.time_logs_collection.delete_many({"log_id": {"$in": list(rejected)}})
+                logs = [log for log in logs if log["log_id"] not in rejected]
+            await self._count_time_logs(
+                [{**log, "project_id": tasks.get(log["task_id"], {}).get("project_id")} for log in logs], list(counters)
+            )
+            counted += len(logs)
+        return counted
+
+    async def reconcile_hours(self) -> Dict:
+        """Recompute task total_hours, the hour_totals counters and daily_hours from the raw time logs.
+
+        Archived tasks are corrected too, and the archive_totals task counts
+        are rebuilt from tasks_archive. Logs waiting for count_pending_time_logs
+        are included and lose their marker. Meant for maintenance windows: logs
+        written while it runs may be missed by the recomputed counters.
+        Returns how many tasks and counters changed.
+        """
+        await self.time_logs_collection.update_many(
+            {"uncounted": {"$exists": True}}, {"$unset": {"uncounted": "", "access_scope": ""}}
+        )
+        def sum_logged_hours(field: str):
+            return self.time_logs_collection.aggregate([{"$group": {"_id": f"${field}", "hours": {"$sum": "$hours"}}}])
+
+        task_hours = {row["_id"]: row["hours"] async for row in sum_logged_hours("task_id")}
+        tasks_corrected = 0
+        for collection in (self.tasks_collection, self.tasks_archive_collection):
+            task_updates = [
+                UpdateOne({"_id": task["_id"]}, {"$set": {"total_hours": task_hours.get(task["task_id"], 0)}})
+                async for task in collection.find({}, {"task_id": 1, "total_hours": 1})
+                if task.get("total_hours") != task_hours.get(task["task_id"], 0)
+            ]
+            if task_updates:
+                await collection.bulk_write(task_updates, ordered=False)
+            tasks_corrected += len(task_updates)
+
+        counters = {_hours_key(): sum(task_hours.values())}
+        async for row in sum_logged_hours("employee_id"):
+            counters[_hours_key(employee_id=row["_id"])] = row["hours"]
+        async for row in self.tasks_collection.aggregate([
+            {"$unionWith": {"coll": "tasks_archive"}},
+            {"$match": {"project_id": {"$ne": None}}},
+            {"$group": {"_id": "$project_id", "hours": {"$sum": "$total_hours"}}}
+        ]):
+            counters[_hours_key(project_id=row["_id"])] = row["hours"]
+
+        await self.hour_totals_collection.bulk_write([
+            ReplaceOne({"_id": key}, {"_id": key, "hours": hours}, upsert=True) for key, hours in counters.items()
+        ], ordered=False)
+        await self.hour_totals_collection.delete_many({"_id": {"$nin": list(counters)}})
+
+        # $out swaps in the rebuilt buckets in one step and keeps the collection's indexes
+        await self.time_logs_collection.aggregate(DAILY_HOURS_REBUILD_PIPELINE).to_list(length=None)
+
+        await self.archive_totals_collection.delete_many({})
+        archive_updates = _archive_total_updates(
+            await self.tasks_archive_collection.find({}, {"_id": 0, "assigned_to": 1, "priority": 1}).to_list(None)
+        )
+        if archive_updates:
+            await self.archive_totals_collection.bulk_write(archive_updates, ordered=False)
+        return {"tasks_corrected": tasks_corrected, "counters": len(counters)}
+
+    # Project Management
+    async def add_project(self, project: Project) -> bool:
+        try:
+            await self.projects_collection.insert_one(project.to_dict())
+            self.cache.delete(("project", project.project_id))
+            self.cache.delete_prefix(("projects",))
+            return True
+        except DuplicateKeyError:
+            return False
+        except Exception as e:
+            logger.error("Error adding project: %s", e)
+            return False
+
+    async def get_project_by_id(self, project_id: int) -> Optional[Dict]:
+        try:
+            key = ("project", project_id)
+            project = self.cache.get(key)
+            if project is not None:
+                return dict(project)
+
+            project = await self.projects_collection.find_one({"project_id": project_id}, {"_id": 0})
+            if project:
+                self.cache.set(key, dict(project))
+            return project
+        except Exception as e:
+            logger.error("Error getting project: %s", e)
+            return None
+
+    async def get_all_projects(self, after: Optional[int] = None, limit: Optional[int] = None,
+                               fields: Optional[List[str]] = None) -> List[Dict]:
+        try:
+            key = ("projects", after, limit, tuple(fields) if fields else None)
+            projects = self.cache.get(key)
+            if projects is not None:
+                return [dict(project) for project in projects]
+
+            projects = await self._find_page(
+                self.reads.projects, {}, "project_id", after, limit,
+                _projection(fields, PROJECT_FIELDS, "project_id", {"_id": 0})
+            )
+            self.cache.set(key, [dict(project) for project in projects])
+            return projects
+        except Exception as e:
+            logger.error("Error getting all projects: %s", e)
+            return []
+
+    # Bulk Operations
+    async def add_tasks(self, tasks: List[Task]) -> List[Dict]:
+        """Insert many tasks with one unordered insert_many; returns one result per task."""
+        if not tasks:
+            return []
+        try:
+            await self.tasks_collection.insert_many(await self._task_documents(tasks), ordered=False)
+            errors = {}
+        except BulkWriteError as e:
+            errors = _bulk_write_errors(e)
+        except Exception as e:
+            logger.error("Error adding tasks: %s", e)
+            errors = {index: str(e) for index in range(len(tasks))}
+        for index, task in enumerate(tasks):
+            if index not in errors:
+                self._publish_task_added(task)
+        return [
+            _bulk_result(index, TaskAccess.ERROR if index in errors else TaskAccess.OK, errors.get(index),
+                         task_id=task.task_id)
+            for index, task in enumerate(tasks)
+        ]
+
+    async def _tasks_for_items(self, items: List[Dict]) -> Dict[int, Dict]:
+        # One $in query fetching the assignee of every task the bulk items refer to
+        tasks = await self.tasks_collection.find(
+            {"task_id": {"$in": list({item["task_id"] for item in items})}},
+            {"_id": 0, "task_id": 1, "assigned_to": 1, "project_id": 1, "status": 1}
+        ).to_list(length=None)
+        return {task["task_id"]: task for task in tasks}
+
+    async def update_task_statuses(self, updates: List[Dict], assignee: Optional[int] = None) -> List[Dict]:
+        """Apply many {"task_id", "status"} updates with one unordered bulk_write.
+
+        Access is checked per item against a single prefetch of the affected
+        tasks, and the assignee condition is repeated in each write filter.
+        """
+        if not updates:
+            return []
+        try:
+            tasks = await self._tasks_for_items(updates)
+            access = [_task_access(tasks.get(item["task_id"]), assignee) for item in updates]
+            now = datetime.now().isoformat()
+            requests, positions = [], []
+            for index, item in enumerate(updates):
+                if access[index]:
+                    query = {"task_id": item["task_id"]}
+                    if assignee is not None:
+                        query["assigned_to"] = assignee
+                    requests.append(UpdateOne(query, {"$set": _status_fields(item["status"], now)}))
+                    positions.append(index)
+            errors = {}
+            if requests:
+                try:
+                    await self.tasks_collection.bulk_write(requests, ordered=False)
+                except BulkWriteError as e:
+                    errors = {positions[op]: message for op, message in _bulk_write_errors(e).items()}
+                for index in positions:
+                    if index not in errors:
+                        self._publish_status_change(updates[index]["task_id"], tasks[updates[index]["task_id"]],
+                                                    updates[index]["status"])
+            access = await self._mark_archived([item["task_id"] for item in updates], access)
+        except Exception as e:
+            logger.error("Error updating task statuses: %s", e)
+            access = [TaskAccess.ERROR] * len(updates)
+            errors = {}
+        return [
+            _bulk_result(index, TaskAccess.ERROR if index in errors else access[index], errors.get(index),
+                         task_id=item["task_id"])
+            for index, item in enumerate(updates)
+        ]
+
+    async def add_time_logs(self, entries: List[Dict], assignee: Optional[int] = None) -> List[Dict]:
+        """Insert many {"task_id", "employee_id", "hours", "description", "logged_at", "log_id"} time logs.
+
+        A single prefetch of the affected tasks runs alongside one unordered
+        insert_many of the marked logs; access is checked per entry and the
+        logs of rejected entries are deleted again. Accepted hours are then
+        added with _count_time_logs in one more round trip. Only entries whose
+        insert failed are reported as ERROR. An entry whose log_id is already
+        stored for the same task and employee is a retry: it is reported OK
+        and not counted again.
+        """
+        if not entries:
+            return []
+        try:
+            now = datetime.now().isoformat()
+            logs = [
+                {
+                    "log_id": item.get("log_id") or _new_log_id(),
+                    "task_id": item["task_id"],
+                    "employee_id": item["employee_id"],
+                    "hours": item["hours"],
+                    "description": item.get("description", ""),
+                    "logged_at": item.get("logged_at") or now
+                }
+                for item in entries
+            ]
+            tasks, inserted = await asyncio.gather(
+                self._tasks_for_items(entries),
+                self.time_logs_collection.insert_many(
+                    [{**log, "uncounted": TIME_LOG_COUNTERS, "access_scope": assignee} for log in logs], ordered=False
+                ),
+                return_exceptions=True
+            )
+            if isinstance(tasks, Exception):
+                raise tasks
+            access = [_task_access(tasks.get(item["task_id"]), assignee) for item in entries]
+            errors, duplicates = {}, []
+            if isinstance(inserted, BulkWriteError):
+                errors = _bulk_write_errors(inserted)
+                duplicates = [
+                    error["index"] for error in inserted.details.get("writeErrors", [])
+                    if error.get("code") == DUPLICATE_KEY_ERROR
+                ]
+            elif isinstance(inserted, Exception):
+                raise inserted
+            rejected = [log["log_id"] for index, log in enumerate(logs) if not access[index] and index not in errors]
+            if rejected:
+                await self.time_logs_collection.delete_many({"log_id": {"$in": rejected}})
+            retried = await self._stored_retries([(index, logs[index]) for index in duplicates if access[index]])
+            errors = {index: message for index, message in errors.items() if access[index] and index not in retried}
+            written = [
+                {**log, "project_id": tasks[log["task_id"]].get("project_id")}
+                for index, log in enumerate(logs) if access[index] and index not in errors and index not in retried
+            ]
+            if written:
+                await self._count_time_logs(written)
+            for log in written:
+                self._publish_time_logged(log, tasks[log["task_id"]].get("assigned_to"))
+            access = await self._mark_archived([item["task_id"] for item in entries], access)
+        except Exception as e:
+            logger.error("Error adding time logs: %s", e)
+            access = [TaskAccess.ERROR] * len(entries)
+            errors = {}
+        return [
+            _bulk_result(index, TaskAccess.ERROR if index in errors else access[index], errors.get(index),
+                         task_id=item["task_id"])
+            for index, item in enumerate(entries)
+        ]
+
+    def cache_stats(self) -> Dict:
+        return {"read_cache": self.cache.stats(), **super().cache_stats()}
+
+    # Archival
+    async def archive_completed_tasks(self, older_than_days: int, batch_size: int = 1000) -> int:
+        """Move tasks completed more than ``older_than_days`` days ago from tasks into tasks_archive.
+
+        Each batch is copied to the archive, then removed from tasks only if it
+        is still completed and unchanged, so a task reopened or touched
+        meanwhile stays live. Archived tasks are counted into archive_totals,
+        which keeps dashboard totals whole. Their time logs stay in time_logs
+        and the hour rollups are untouched. Safe to re-run and to run from
+        several processes; reconcile_hours rebuilds archive_totals if a run is
+        interrupted between steps. A task counts as archived only for the
+        run whose delete removed it from tasks. Returns the number of tasks
+        archived.
+        """
+        query = _archive_filter((datetime.now() - timedelta(days=older_than_days)).isoformat())
+        # Few deletes in flight, so a run inside an API worker leaves its connection pool to the requests
+        deletes = asyncio.Semaphore(ARCHIVE_DELETE_CONCURRENCY)
+
+        async def delete(task: Dict):
+            async with deletes:
+                return await self.tasks_collection.delete_one(
+                    {"task_id": task["task_id"], "status": "Completed", "updated_at": task["updated_at"]}
+                )
+
+        archived = 0
+        last_task_id = None
+        while True:
+            batch_query = {**query, "task_id": {"$gt": last_task_id}} if last_task_id is not None else query
+            batch = await self.tasks_collection.find(batch_query, {"_id": 0}, sort=[("task_id", ASCENDING)],
+                                                     limit=batch_size).to_list(length=None)
+            if not batch:
+                return archived
+            last_task_id = batch[-1]["task_id"]
+            task_ids = [task["task_id"] for task in batch]
+
+            await self.tasks_archive_collection.bulk_write(
+                [ReplaceOne({"task_id": task["task_id"]}, task, upsert=True) for task in batch], ordered=False
+            )
+            # One delete per task, so each deleted_count says whether this run removed it
+            deleted = await asyncio.gather(*(delete(task) for task in batch))
+            kept = set(await self.tasks_collection.distinct("task_id", {"task_id": {"$in": task_ids}}))
+            if kept:
+                await self.tasks_archive_collection.delete_many({"task_id": {"$in": list(kept)}})
+            moved = [task for task, result in zip(batch, deleted) if result.deleted_count]
+            if moved:
+                await self.archive_totals_collection.bulk_write(_archive_total_updates(moved), ordered=False)
+            archived += len(moved)
+
+    async def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """Leases are documents in the leases collection, shared by every process using the database."""
+        now = datetime.now(timezone.utc)
+        try:
+            await self.leases_collection.update_one(
+                {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # The lease exists and belongs to someone else
+            return False
+        except Exception as e:
+            logger.error("Error acquiring lease %s: %s", name, e)
+            return False
+
+    # Reporting
+    async def get_hours_report(self, start: date, end: date, period: str = "day", group_by: Optional[List[str]] = None,
+                               employee_id: Optional[int] = None, project_id: Optional[int] = None) -> List[Dict]:
+        try:
+            return await self.reads.daily_hours.aggregate(
+                _hours_report_pipeline(start, end, period, group_by, employee_id, project_id)
+            ).to_list(length=None)
+        except Exception as e:
+            logger.error("Error getting hours report: %s", e)
+            return []
+
+    # Dashboard Analytics
+    async def get_dashboard_stats(self, employee_id: Optional[int] = None) -> Dict:
+        try:
+            facets, hours, archived = await asyncio.gather(
+                self.reads.tasks.aggregate(_dashboard_stats_pipeline(employee_id)).to_list(length=1),
+                self.get_hours(employee_id or None),
+                self.reads.archive_totals.find_one({"_id": _hours_key(employee_id or None)})
+            )
+            return _format_dashboard_stats(facets[0] if facets else {}, hours, archived)
+        except Exception as e:
+            logger.error("Error getting dashboard stats: %s", e)
             return {}
+
+    # Data Export
+    async def _iter_batches(self, cursor, batch_size: int):
+        batch = await cursor.to_list(length=batch_size)
+        while batch:
+            yield batch
+            batch = await cursor.to_list(length=batch_size)
+
+    async def iter_tasks(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         project_id: Optional[int] = None, batch_size: int = 1000, include_archived: bool = False):
+        """Yield tasks in batches straight from a cursor, filtered by created_at and project.
+
+        Only one batch is held in memory at a time, so exports of any size run
+        in constant memory. With include_archived, archived tasks follow the
+        live ones. Errors propagate to the caller.
+        """
+        query = _date_range_filter("created_at", start, end)
+        if project_id is not None:
+            query["project_id"] = project_id
+        for collection in (self.reads.tasks, self.reads.tasks_archive) if include_archived else (self.reads.tasks,):
+            cursor = collection.find(query, {"_id": 0}, batch_size=batch_size).sort("task_id", ASCENDING)
+            async for batch in self._iter_batches(cursor, batch_size):
+                yield batch
+
+    async def iter_time_logs(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                             project_id: Optional[int] = None, batch_size: int = 1000):
+        query = _date_range_filter("logged_at", start, end)
+        if project_id is not None:
+            task_ids, archived_task_ids = await asyncio.gather(
+                self.reads.tasks.distinct("task_id", {"project_id": project_id}),
+                self.reads.tasks_archive.distinct("task_id", {"project_id": project_id})
+            )
+            query["task_id"] = {"$in": task_ids + archived_task_ids}
+        cursor = self.reads.time_logs.find(query, TIME_LOG_PROJECTION, batch_size=batch_size)
+        async for batch in self._iter_batches(cursor.sort("logged_at", ASCENDING), batch_size):
+            yield batch
+
+    async def iter_employees(self, batch_size: int = 1000):
+        cursor = self.reads.employees.find(
+            {}, {"password_hash": 0, "_id": 0}, batch_size=batch_size
+        ).sort("employee_id", ASCENDING)
+        async for batch in self._iter_batches(cursor, batch_size):
+            yield batch
+
+
+def _apply_projection(doc: Dict, projection: Dict) -> Dict:
+    """Apply a _projection() result to a stored document, the way find() would."""
+    included = [field for field, value in projection.items() if value and field != "_id"]
+    if included:
+        return {field: doc[field] for field in included if field in doc}
+    return {field: value for field, value in doc.items() if field not in projection}
+
+def _in_range(value: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> bool:
+    """In-memory counterpart of _date_range_filter for ISO timestamp strings."""
+    return (not start or value >= start.isoformat()) and (not end or value < end.isoformat())
+
+def _report_period(day: str, period: str) -> str:
+    """In-memory counterpart of REPORT_PERIODS."""
+    if period == "week":
+        year, week, _ = date.fromisoformat(day).isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "month":
+        return day[:7]
+    return day
+
+@instrumented
+class InMemoryTaskManager(TaskStore):
+    """Embedded TaskStore keeping every collection in process memory.
+
+    Meant for single-node installs, tests and benchmarks that should not need
+    a MongoDB server. Documents live in dicts keyed by id, with hash indexes
+    on email, assigned_to and project_id (each holding task ids in ascending
+    order for keyset paging), time logs indexed by task and by employee, and
+    the same hour_totals and daily_hours rollups the Mongo backend keeps.
+    Its coroutines never wait on I/O, so they run inline on the event loop;
+    only password hashing and checking go to the PasswordHasher pool. All
+    methods also take one re-entrant lock, so SyncTaskStore facades in
+    several threads can share a store. Data does not survive a restart.
+    """
+
+    def __init__(self, password_hasher: Optional[PasswordHasher] = None, events: Optional[DashboardEvents] = None):
+        super().__init__(password_hasher, events)
+        self._lock = threading.RLock()
+        self._employees: Dict[int, Dict] = {}
+        self._tasks: Dict[int, Dict] = {}
+        self._projects: Dict[int, Dict] = {}
+        # Sorted primary keys, for keyset pagination
+        self._employee_ids: List[int] = []
+        self._task_ids: List[int] = []
+        self._project_ids: List[int] = []
+        # Secondary indexes
+        self._employee_by_email: Dict[str, int] = {}
+        self._tasks_by_assignee: Dict[int, List[int]] = defaultdict(list)
+        self._tasks_by_project: Dict[Optional[int], List[int]] = defaultdict(list)
+        self._time_logs: List[Dict] = []
+        self._logs_by_task: Dict[int, List[Dict]] = defaultdict(list)
+        self._logs_by_employee: Dict[int, List[Dict]] = defaultdict(list)
+        self._log_by_id: Dict[str, Dict] = {}
+        # Inverted index for search: term -> live task ids, and each task's weighted terms
+        self._term_postings: Dict[str, set] = defaultdict(set)
+        self._task_terms: Dict[int, Dict[str, int]] = {}
+        # Cold tier: archived tasks are only indexed by task_id
+        self._archived_tasks: Dict[int, Dict] = {}
+        self._archived_ids: List[int] = []
+        # Rollups: hour_totals and archive_totals counters, and daily_hours buckets grouped by day
+        self._hour_totals: Dict[str, float] = defaultdict(float)
+        self._archive_totals: Dict[str, Dict] = {}
+        self._daily_hours: Dict[str, Dict[Tuple[int, Optional[int]], List]] = {}
+        self._days: List[str] = []
+        self._counters: Dict[str, int] = defaultdict(int)
+        # Lease name -> (holder, monotonic expiry)
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    # There is no connection to manage; data lives as long as the object
+    def connect(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def ping(self) -> bool:
+        return True
+
+    def pool_stats(self) -> Dict:
+        return {"max_pool_size": 0, "saturation": 0.0, "servers": {}}
+
+    async def ensure_indexes(self) -> bool:
+        # The indexes are maintained by every write
+        return True
+
+    async def seed_counters(self) -> bool:
+        with self._lock:
+            for counter, ids in (("employee_id", self._employee_ids), ("task_id", self._task_ids),
+                                 ("task_id", self._archived_ids), ("project_id", self._project_ids)):
+                if ids:
+                    self._counters[counter] = max(self._counters[counter], ids[-1])
+            return True
+
+    # Id Allocation
+    async def _allocate_id(self, counter: str) -> int:
+        with self._lock:
+            self._counters[counter] += 1
+            return self._counters[counter]
+
+    async def reserve_task_ids(self, count: int) -> List[int]:
+        with self._lock:
+            self._counters["task_id"] += count
+            return list(range(self._counters["task_id"] - count + 1, self._counters["task_id"] + 1))
+
+    def _find_page(self, documents: Dict[int, Dict], ids: List[int], query: Dict, after: Optional[int],
+                   limit: Optional[int], projection: Dict) -> List[Dict]:
+        """Keyset-paginate ``ids`` (ascending) after ``after``, keeping documents that match ``query``."""
+        with self._lock:
+            page = []
+            for index in range(bisect.bisect_right(ids, after) if after is not None else 0, len(ids)):
+                doc = documents[ids[index]]
+                if all(doc.get(field) == value for field, value in query.items()):
+                    page.append(_apply_projection(doc, projection))
+                    if limit and len(page) >= limit:
+                        break
+            return page
+
+    def _task_ids_for(self, query: Dict) -> List[int]:
+        # Pick the narrowest index the query can use
+        if "assigned_to" in query:
+            return self._tasks_by_assignee.get(query["assigned_to"], [])
+        if "project_id" in query:
+            return self._tasks_by_project.get(query["project_id"], [])
+        return self._task_ids
+
+    async def _find_tasks(self, query: Dict, after: Optional[int], limit: Optional[int],
+                          fields: Optional[List[str]], include_archived: bool = False) -> List[Dict]:
+        projection = _projection(fields, TASK_FIELDS, "task_id", TASK_LIST_PROJECTION)
+        tasks = self._find_page(self._tasks, self._task_ids_for(query), query, after, limit, projection)
+        if include_archived:
+            archived = self._find_page(self._archived_tasks, self._archived_ids, query, after, limit, projection)
+            tasks = sorted(tasks + archived, key=lambda task: task["task_id"])[:limit or None]
+        return tasks
+
+    # Employee Management
+    async def add_employee(self, employee: Employee) -> bool:
+        with self._lock:
+            if employee.employee_id in self._employees or employee.email in self._employee_by_email:
+                return False
+            employee_data = employee.to_dict()
+            employee_data["password_hash"] = employee.password_hash
+            self._employees[employee.employee_id] = employee_data
+            bisect.insort(self._employee_ids, employee.employee_id)
+            self._employee_by_email[employee.email] = employee.employee_id
+            return True
+
+    async def _find_employee_by_email(self, email: str) -> Optional[Dict]:
+        with self._lock:
+            employee_id = self._employee_by_email.get(email)
+            return dict(self._employees[employee_id]) if employee_id is not None else None
+
+    async def _set_password_hash(self, employee_id: int, password_hash: bytes):
+        with self._lock:
+            self._employees[employee_id]["password_hash"] = password_hash
+
+    async def get_employee_by_id(self, employee_id: int) -> Optional[Dict]:
+        with self._lock:
+            employee = self._employees.get(employee_id)
+            return _apply_projection(employee, {"password_hash": 0}) if employee else None
+
+    async def get_all_employees(self, after: Optional[int] = None, limit: Optional[int] = None,
+                                fields: Optional[List[str]] = None) -> List[Dict]:
+        return self._find_page(self._employees, self._employee_ids, {}, after, limit,
+                               _projection(fields, EMPLOYEE_FIELDS, "employee_id", {"password_hash": 0, "_id": 0}))
+
+    # Task Management
+    def _index_task_text(self, task: Dict):
+        terms = defaultdict(int)
+        for field, weight in TASK_TEXT_WEIGHTS.items():
+            for term in _search_terms(task.get(field) or ""):
+                terms[term] += weight
+        self._task_terms[task["task_id"]] = terms
+        for term in terms:
+            self._term_postings[term].add(task["task_id"])
+
+    def _unindex_task_text(self, task_id: int):
+        for term in self._task_terms.pop(task_id, {}):
+            self._term_postings[term].discard(task_id)
+            if not self._term_postings[term]:
+                del self._term_postings[term]
+
+    def _insert_task(self, task: Task) -> bool:
+        if task.task_id in self._tasks:
+            return False
+        project = self._projects.get(task.project_id)
+        task_data = {**task.to_dict(), "project_name": project["name"] if project else None}
+        self._tasks[task.task_id] = task_data
+        bisect.insort(self._task_ids, task.task_id)
+        bisect.insort(self._tasks_by_assignee[task.assigned_to], task.task_id)
+        bisect.insort(self._tasks_by_project[task.project_id], task.task_id)
+        self._index_task_text(task_data)
+        return True
+
+    async def add_task(self, task: Task) -> bool:
+        with self._lock:
+            if not self._insert_task(task):
+                return False
+        self._publish_task_added(task)
+        return True
+
+    async def get_task_by_id(self, task_id: int, include_archived: bool = False) -> Optional[Dict]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None and include_archived:
+                task = self._archived_tasks.get(task_id)
+            return dict(task) if task else None
+
+    async def check_task_access(self, task_id: int, assignee: Optional[int] = None) -> TaskAccess:
+        with self._lock:
+            return await self._check_archived(task_id, _task_access(self._tasks.get(task_id), assignee))
+
+    async def _guarded_task_update(self, task_id: int, fields: Dict[str, Any], assignee: Optional[int] = None,
+                                   increments: Optional[Dict[str, float]] = None) -> Tuple[TaskAccess, Optional[Dict]]:
+        with self._lock:
+            return self._update_task(task_id, fields, assignee, increments)
+
+    async def _archived_task_ids(self, task_ids: List[int]) -> set:
+        with self._lock:
+            return {task_id for task_id in task_ids if task_id in self._archived_tasks}
+
+    def _update_task(self, task_id: int, fields: Dict[str, Any], assignee: Optional[int] = None,
+                     increments: Optional[Dict[str, float]] = None) -> Tuple[TaskAccess, Optional[Dict]]:
+        """Apply ``fields`` to a task if ``assignee`` may change it; returns the access and the task before."""
+        task = self._tasks.get(task_id)
+        access = _task_access(task, assignee)
+        if not access:
+            return access, task and dict(task)
+        before = dict(task)
+        if "project_id" in fields and fields["project_id"] != task["project_id"]:
+            self._tasks_by_project[task["project_id"]].remove(task_id)
+            bisect.insort(self._tasks_by_project[fields["project_id"]], task_id)
+        task.update(fields)
+        for field, amount in (increments or {}).items():
+            task[field] = task.get(field, 0) + amount
+        if any(field in TASK_TEXT_WEIGHTS for field in fields):
+            self._unindex_task_text(task_id)
+            self._index_task_text(task)
+        return access, before
+
+    async def search_tasks(self, text: str, skip: int = 0, limit: Optional[int] = None,
+                           fields: Optional[List[str]] = None, status: Optional[str] = None,
+                           priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                           project_id: Optional[int] = None) -> List[Dict]:
+        """Rank live tasks by the summed field weights of the words they share with ``text``.
+
+        Only plain words are understood: there is no stemming and no stop
+        word list, and quoted phrases and -excluded words are matched as
+        ordinary words. Scores are on a different scale from MongoDB's
+        textScore; see "Task search" in the README.
+        """
+        query = _task_filter(status, priority, assigned_to)
+        if project_id is not None:
+            query["project_id"] = project_id
+        projection = _projection(fields, TASK_FIELDS, "task_id", TASK_LIST_PROJECTION)
+        terms = set(_search_terms(text))
+        with self._lock:
+            scored = []
+            for task_id in set().union(*(self._term_postings.get(term, ()) for term in terms)):
+                task = self._tasks[task_id]
+                if all(task.get(field) == value for field, value in query.items()):
+                    task_terms = self._task_terms[task_id]
+                    scored.append((-sum(task_terms.get(term, 0) for term in terms), task_id))
+            scored.sort()
+            page = scored[skip:skip + limit if limit else None]
+            return [{**_apply_projection(self._tasks[task_id], projection), "score": -score} for score, task_id in page]
+
+    def _insert_time_logs(self, logs: List[Dict]):
+        """Store logs carrying their task's project_id, and fold them into the rollups."""
+        for log in logs:
+            stored = {field: value for field, value in log.items() if field != "project_id"}
+            self._time_logs.append(stored)
+            self._logs_by_task[log["task_id"]].append(stored)
+            self._logs_by_employee[log["employee_id"]].append(stored)
+            if "log_id" in log:
+                self._log_by_id[log["log_id"]] = stored
+        self._record_hours(logs)
+
+    async def add_time_log(self, task_id: int, employee_id: int, hours: float, description: str = "",
+                           assignee: Optional[int] = None, log_id: Optional[str] = None) -> TaskAccess:
+        with self._lock:
+            access = _task_access(self._tasks.get(task_id), assignee)
+            if not access:
+                return await self._check_archived(task_id, access)
+            retry = self._stored_retry(log_id, task_id, employee_id)
+            if retry is not None:
+                return retry
+
+            now = datetime.now().isoformat()
+            _, before = self._update_task(task_id, {"updated_at": now}, increments={"total_hours": hours})
+            log = {
+                "log_id": log_id or _new_log_id(),
+                "task_id": task_id,
+                "employee_id": employee_id,
+                "hours": hours,
+                "description": description,
+                "logged_at": now
+            }
+            self._insert_time_logs([{**log, "project_id": before.get("project_id")}])
+        self._publish_time_logged(log, before.get("assigned_to"))
+        return TaskAccess.OK
+
+    def _stored_retry(self, log_id: Optional[str], task_id: int, employee_id: int) -> Optional[TaskAccess]:
+        """OK if ``log_id`` is stored for this task and employee, ERROR if for another log, None if it is new."""
+        stored = self._log_by_id.get(log_id)
+        if stored is None:
+            return None
+        same_log = (stored["task_id"], stored["employee_id"]) == (task_id, employee_id)
+        return TaskAccess.OK if same_log else TaskAccess.ERROR
+
+    def _add_daily_hours(self, employee_id: int, project_id: Optional[int], day: str, hours: float, entries: int):
+        buckets = self._daily_hours.get(day)
+        if buckets is None:
+            buckets = self._daily_hours[day] = {}
+            bisect.insort(self._days, day)
+        bucket = buckets.setdefault((employee_id, project_id), [0.0, 0])
+        bucket[0] += hours
+        bucket[1] += entries
+
+    def _record_hours(self, logs: List[Dict]):
+        """Fold time logs (with project_id) into the hour_totals counters and daily_hours buckets."""
+        for log in logs:
+            self._hour_totals[_hours_key()] += log["hours"]
+            self._hour_totals[_hours_key(employee_id=log["employee_id"])] += log["hours"]
+            if log["project_id"] is not None:
+                self._hour_totals[_hours_key(project_id=log["project_id"])] += log["hours"]
+            self._add_daily_hours(log["employee_id"], log["project_id"], log["logged_at"][:10], log["hours"], 1)
+
+    async def _move_project_hours(self, task_id: int, old_project_id: Optional[int],
+                                  new_project_id: Optional[int], hours: float):
+        if old_project_id == new_project_id or not hours:
+            return
+        with self._lock:
+            if old_project_id is not None:
+                self._hour_totals[_hours_key(project_id=old_project_id)] -= hours
+            if new_project_id is not None:
+                self._hour_totals[_hours_key(project_id=new_project_id)] += hours
+            for log in self._logs_by_task.get(task_id, []):
+                day = log["logged_at"][:10]
+                self._add_daily_hours(log["employee_id"], old_project_id, day, -log["hours"], -1)
+                self._add_daily_hours(log["employee_id"], new_project_id, day, log["hours"], 1)
+
+    async def get_hours(self, employee_id: Optional[int] = None, project_id: Optional[int] = None) -> float:
+        with self._lock:
+            return self._hour_totals.get(_hours_key(employee_id, project_id), 0)
+
+    def _logs_in_range(self, logs: List[Dict], start: Optional[datetime] = None,
+                       end: Optional[datetime] = None) -> List[Dict]:
+        return sorted((dict(log) for log in logs if _in_range(log["logged_at"], start, end)),
+                      key=lambda log: log["logged_at"])
+
+    async def get_task_time_logs(self, task_id: int, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None) -> List[Dict]:
+        with self._lock:
+            return self._logs_in_range(self._logs_by_task.get(task_id, []), start, end)
+
+    async def get_task_time_logs_for(self, task_id: int, assignee: Optional[int] = None,
+                                     start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None,
+                                     include_archived: bool = False) -> Tuple[TaskAccess, List[Dict]]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None and include_archived:
+                task = self._archived_tasks.get(task_id)
+            access = _task_access(task, assignee)
+            return access, (self._logs_in_range(self._logs_by_task.get(task_id, []), start, end) if access else [])
+
+    async def get_employee_time_logs(self, employee_id: int, start: Optional[datetime] = None,
+                                     end: Optional[datetime] = None) -> List[Dict]:
+        with self._lock:
+            employee_logs = self._logs_in_range(self._logs_by_employee.get(employee_id, []), start, end)
+            for log in employee_logs:
+                task = self._tasks.get(log["task_id"]) or self._archived_tasks.get(log["task_id"])
+                log["task_title"] = task["title"] if task else None
+            return employee_logs
+
+    async def reconcile_hours(self) -> Dict:
+        """Recompute task total_hours, the hour_totals counters and daily_hours from the stored time logs."""
+        with self._lock:
+            task_hours = defaultdict(float)
+            for log in self._time_logs:
+                task_hours[log["task_id"]] += log["hours"]
+            tasks_corrected = 0
+            all_tasks = {**self._archived_tasks, **self._tasks}
+            for task_id, task in all_tasks.items():
+                if task.get("total_hours") != task_hours.get(task_id, 0):
+                    task["total_hours"] = task_hours.get(task_id, 0)
+                    tasks_corrected += 1
+
+            self._hour_totals = defaultdict(float)
+            self._daily_hours, self._days = {}, []
+            self._record_hours([
+                {**log, "project_id": all_tasks[log["task_id"]]["project_id"] if log["task_id"] in all_tasks
+                 else None}
+                for log in self._time_logs
+            ])
+            self._archive_totals = {}
+            self._add_archive_totals(self._archived_tasks.values())
+            return {"tasks_corrected": tasks_corrected, "counters": len(self._hour_totals)}
+
+    # Archival
+    def _add_archive_totals(self, tasks):
+        for key, count in _archive_counts(tasks).items():
+            total = self._archive_totals.setdefault(key, {"tasks": 0, "priority": {}})
+            total["tasks"] += count["tasks"]
+            for priority, number in count["priority"].items():
+                total["priority"][priority] = total["priority"].get(priority, 0) + number
+
+    async def archive_completed_tasks(self, older_than_days: int, batch_size: int = 1000) -> int:
+        """Move tasks completed more than ``older_than_days`` days ago out of the live indexes into the archive."""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        with self._lock:
+            moved = [
+                self._tasks.pop(task_id) for task_id in list(self._task_ids)
+                if self._tasks[task_id]["status"] == "Completed"
+                and (self._tasks[task_id].get("completed_at") or self._tasks[task_id]["updated_at"]) < cutoff
+            ]
+            if not moved:
+                return 0
+            for task in moved:
+                self._archived_tasks[task["task_id"]] = task
+                bisect.insort(self._archived_ids, task["task_id"])
+                self._unindex_task_text(task["task_id"])
+            self._task_ids = [task_id for task_id in self._task_ids if task_id in self._tasks]
+            for index in (self._tasks_by_assignee, self._tasks_by_project):
+                for key, task_ids in index.items():
+                    index[key] = [task_id for task_id in task_ids if task_id in self._tasks]
+            self._add_archive_totals(moved)
+            return len(moved)
+
+    async def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """Leases here only coordinate callers sharing this store, since the data is per process."""
+        now = time.monotonic()
+        with self._lock:
+            current = self._leases.get(name)
+            if current and current[0] != holder and current[1] > now:
+                return False
+            self._leases[name] = (holder, now + ttl_seconds)
+            return True
+
+    # Project Management
+    async def add_project(self, project: Project) -> bool:
+        with self._lock:
+            if project.project_id in self._projects:
+                return False
+            self._projects[project.project_id] = project.to_dict()
+            bisect.insort(self._project_ids, project.project_id)
+            return True
+
+    async def get_project_by_id(self, project_id: int) -> Optional[Dict]:
+        with self._lock:
+            project = self._projects.get(project_id)
+            return dict(project) if project else None
+
+    async def get_all_projects(self, after: Optional[int] = None, limit: Optional[int] = None,
+                               fields: Optional[List[str]] = None) -> List[Dict]:
+        return self._find_page(self._projects, self._project_ids, {}, after, limit,
+                               _projection(fields, PROJECT_FIELDS, "project_id", {"_id": 0}))
+
+    # Bulk Operations
+    async def add_tasks(self, tasks: List[Task]) -> List[Dict]:
+        """Insert many tasks; returns one result per task, like the Mongo unordered insert."""
+        with self._lock:
+            inserted = [self._insert_task(task) for task in tasks]
+        results = []
+        for index, (task, ok) in enumerate(zip(tasks, inserted)):
+            if ok:
+                self._publish_task_added(task)
+            results.append(_bulk_result(index, TaskAccess.OK if ok else TaskAccess.ERROR,
+                                        None if ok else f"duplicate key: task_id {task.task_id}",
+                                        task_id=task.task_id))
+        return results
+
+    async def update_task_statuses(self, updates: List[Dict], assignee: Optional[int] = None) -> List[Dict]:
+        with self._lock:
+            now = datetime.now().isoformat()
+            changes = [
+                self._update_task(item["task_id"], _status_fields(item["status"], now), assignee)
+                for item in updates
+            ]
+        for item, (access, before) in zip(updates, changes):
+            if access:
+                self._publish_status_change(item["task_id"], before, item["status"])
+        access = await self._mark_archived([item["task_id"] for item in updates], [access for access, _ in changes])
+        return [_bulk_result(index, access[index], task_id=item["task_id"]) for index, item in enumerate(updates)]
+
+    async def add_time_logs(self, entries: List[Dict], assignee: Optional[int] = None) -> List[Dict]:
+        with self._lock:
+            access = [_task_access(self._tasks.get(item["task_id"]), assignee) for item in entries]
+            now = datetime.now().isoformat()
+            written = []
+            for index, item in enumerate(entries):
+                if not access[index]:
+                    continue
+                retry = self._stored_retry(item.get("log_id"), item["task_id"], item["employee_id"])
+                if retry is not None:
+                    access[index] = retry
+                    continue
+                _, before = self._update_task(item["task_id"], {"updated_at": now},
+                                              increments={"total_hours": item["hours"]})
+                log = {
+                    "log_id": item.get("log_id") or _new_log_id(),
+                    "task_id": item["task_id"],
+                    "employee_id": item["employee_id"],
+                    "hours": item["hours"],
+                    "description": item.get("description", ""),
+                    "logged_at": item.get("logged_at") or now,
+                    "project_id": before.get("project_id")
+                }
+                # Inserted one by one so a log_id repeated within the batch is seen as a retry
+                self._insert_time_logs([log])
+                written.append((log, before.get("assigned_to")))
+        for log, assigned_to in written:
+            self._publish_time_logged(log, assigned_to)
+        access = await self._mark_archived([item["task_id"] for item in entries], access)
+        return [_bulk_result(index, access[index], task_id=item["task_id"]) for index, item in enumerate(entries)]
+
+    # Reporting
+    async def get_hours_report(self, start: date, end: date, period: str = "day",
+                               group_by: Optional[List[str]] = None, employee_id: Optional[int] = None,
+                               project_id: Optional[int] = None) -> List[Dict]:
+        """Same rows as _hours_report_pipeline, read from the days in [start, end) only."""
+        fields = [REPORT_GROUPS[group] for group in group_by or []]
+        totals = defaultdict(lambda: [0.0, 0])
+        with self._lock:
+            days = self._days[bisect.bisect_left(self._days, start.isoformat()):
+                              bisect.bisect_left(self._days, end.isoformat())]
+            for day in days:
+                for (bucket_employee, bucket_project), (hours, entries) in self._daily_hours[day].items():
+                    if employee_id is not None and bucket_employee != employee_id:
+                        continue
+                    if project_id is not None and bucket_project != project_id:
+                        continue
+                    values = {"employee_id": bucket_employee, "project_id": bucket_project}
+                    total = totals[(_report_period(day, period), *(values[field] for field in fields))]
+                    total[0] += hours
+                    total[1] += entries
+        return [
+            {"period": key[0], **dict(zip(fields, key[1:])), "hours": round(hours, 2), "entries": entries}
+            for key, (hours, entries) in sorted(totals.items(), key=lambda item: item[0][0]) if entries > 0
+        ]
+
+    # Dashboard Analytics
+    async def get_dashboard_stats(self, employee_id: Optional[int] = None) -> Dict:
+        status_counts, priority_counts = defaultdict(int), defaultdict(int)
+        with self._lock:
+            task_ids = self._tasks_by_assignee.get(employee_id, []) if employee_id else self._task_ids
+            for task_id in task_ids:
+                task = self._tasks[task_id]
+                status_counts[task.get("status")] += 1
+                priority_counts[task.get("priority")] += 1
+            hours = self._hour_totals.get(_hours_key(employee_id or None), 0)
+            archived = self._archive_totals.get(_hours_key(employee_id or None))
+        facets = {
+            "status": [{"_id": status, "count": count} for status, count in status_counts.items()],
+            "priority": [{"_id": priority, "count": count} for priority, count in priority_counts.items()]
+        }
+        return _format_dashboard_stats(facets, hours, archived)
+
+    # Data Export
+    def _iter_batches(self, documents: List[Dict], batch_size: int):
+        for offset in range(0, len(documents), batch_size):
+            yield documents[offset:offset + batch_size]
+
+    async def iter_tasks(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                         project_id: Optional[int] = None, batch_size: int = 1000, include_archived: bool = False):
+        with self._lock:
+            tasks = [self._tasks[task_id] for task_id in
+                     (self._tasks_by_project.get(project_id, []) if project_id is not None else self._task_ids)]
+            if include_archived:
+                tasks += [self._archived_tasks[task_id] for task_id in self._archived_ids]
+            tasks = [dict(task) for task in tasks if _in_range(task["created_at"], start, end)
+                     and (project_id is None or task["project_id"] == project_id)]
+        for batch in self._iter_batches(tasks, batch_size):
+            yield batch
+
+    async def iter_time_logs(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                             project_id: Optional[int] = None, batch_size: int = 1000):
+        with self._lock:
+            logs = self._time_logs
+            if project_id is not None:
+                task_ids = self._tasks_by_project.get(project_id, []) + [
+                    task_id for task_id, task in self._archived_tasks.items() if task["project_id"] == project_id
+                ]
+                logs = [log for task_id in task_ids for log in self._logs_by_task.get(task_id, [])]
+            logs = self._logs_in_range(logs, start, end)
+        for batch in self._iter_batches(logs, batch_size):
+            yield batch
+
+    async def iter_employees(self, batch_size: int = 1000):
+        with self._lock:
+            employees = [_apply_projection(self._employees[employee_id], {"password_hash": 0})
+                         for employee_id in self._employee_ids]
+        for batch in self._iter_batches(employees, batch_size):
+            yield batch
+
+
+class SyncTaskStore:
+    """Blocking facade over a TaskStore, for scripts, the maintenance CLI and benchmarks.
+
+    Coroutine methods of the wrapped store run to completion on a private
+    event loop, async generator methods become plain generators, and
+    everything else is passed through. run() executes any other awaitable
+    on the same loop. Must not be called from inside a running event loop.
+    """
+
+    def __init__(self, store: TaskStore):
+        self.store = store
+        self.loop = asyncio.new_event_loop()
+
+    def run(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def __getattr__(self, name):
+        if name in ("store", "loop"):
+            raise AttributeError(name)
+        attribute = getattr(self.store, name)
+        if inspect.isasyncgenfunction(attribute):
+            @functools.wraps(attribute)
+            def iterate(*args, **kwargs):
+                batches = attribute(*args, **kwargs)
+                try:
+                    while True:
+                        try:
+                            yield self.run(batches.__anext__())
+                        except StopAsyncIteration:
+                            return
+                finally:
+                    self.run(batches.aclose())
+            return iterate
+        if inspect.iscoroutinefunction(attribute):
+            @functools.wraps(attribute)
+            def call(*args, **kwargs):
+                return self.run(attribute(*args, **kwargs))
+            return call
+        return attribute
+
+    def close(self):
+        self.store.close()
+        self.loop.close()
+
+
+class TaskManager(SyncTaskStore):
+    """Blocking MongoDB task store: an AsyncTaskManager driven through SyncTaskStore.
+
+    Takes AsyncTaskManager's options and, unless ``startup`` is False,
+    seeds the id counters and creates the indexes right away, raising
+    RuntimeError if that fails.
+    """
+
+    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/", db_name: str = "employee_management",
+                 startup: bool = True, **options):
+        super().__init__(AsyncTaskManager(mongo_uri, db_name, **options))
+        if startup and not self.startup():
+            raise RuntimeError("Task store startup failed: could not seed the id counters or create the indexes")
+
+
+class TimeLogWriteBuffer:
+    """Write-behind queue batching time-log inserts for a TaskStore.
+
+    Submitted entries must already be validated and access-checked. They are
+    given a log_id and written with add_time_logs once ``max_entries`` are
+    queued or ``flush_interval_ms`` has passed, whichever comes first. The
+    log_id makes a flush safe to repeat. Entries whose insert fails, or whose
+    whole flush raises, are requeued, and after ``max_attempts`` failed
+    flushes they are logged and parked in ``parked`` instead. Entries whose
+    task has gone or changed assignee since submission are logged and
+    dropped. close() performs a final flush, so call it on shutdown.
+    """
+
+    def __init__(self, task_manager: TaskStore, flush_interval_ms: int = 200, max_entries: int = 500,
+                 max_attempts: int = 5):
+        self.task_manager = task_manager
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_entries = max_entries
+        self.max_attempts = max_attempts
+        self._entries = []
+        self._attempts = {}
+        self._oldest = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._runner = None
+        self.parked = []
+        self.flushes = 0
+        self.flushed_entries = 0
+        self.failed_entries = 0
+        self.rejected_entries = 0
+        self.last_flush_lag = 0.0
+        self.max_flush_lag = 0.0
+
+    def start(self):
+        self._runner = asyncio.create_task(self._run())
+
+    def submit(self, entry: Dict):
+        if not self._entries:
+            self._oldest = time.monotonic()
+        self._entries.append({**entry, "log_id": entry.get("log_id") or _new_log_id()})
+        TIME_LOG_BUFFER_PENDING.set(len(self._entries))
+        if len(self._entries) >= self.max_entries:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # Keep the flusher alive; whatever is still queued goes out with the next flush
+                logger.exception("Time log flush failed")
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._entries:
+                return
+            entries, oldest = self._entries, self._oldest
+            self._entries, self._oldest = [], None
+            lag = time.monotonic() - oldest
+            TIME_LOG_FLUSH_LAG_SECONDS.observe(lag)
+
+            try:
+                results = await self.task_manager.add_time_logs(entries)
+            except Exception:
+                # Treated as a failed insert of every entry, so they are requeued or parked below
+                logger.exception("Failed to flush %d time logs", len(entries))
+                results = [_bulk_result(index, TaskAccess.ERROR) for index in range(len(entries))]
+            failed, rejected = [], 0
+            for result in results:
+                entry = entries[result["index"]]
+                if result["status"] == TaskAccess.OK.value:
+                    self._attempts.pop(entry["log_id"], None)
+                elif result["status"] == TaskAccess.ERROR.value:
+                    failed.append(entry)
+                else:
+                    # Checked at submission, but the task was removed or reassigned before the flush
+                    self._attempts.pop(entry["log_id"], None)
+                    rejected += 1
+                    TIME_LOG_BUFFER_DROPPED.labels("rejected").inc()
+                    logger.warning("Dropped queued time log (%s): %s", result["status"], entry)
+
+            requeued = []
+            for entry in failed:
+                attempts = self._attempts.get(entry["log_id"], 0) + 1
+                if attempts < self.max_attempts:
+                    self._attempts[entry["log_id"]] = attempts
+                    requeued.append(entry)
+                else:
+                    self._attempts.pop(entry["log_id"], None)
+                    self.parked.append(entry)
+                    TIME_LOG_BUFFER_DROPPED.labels("parked").inc()
+                    logger.error("Parked time log after %d failed flushes: %s", attempts, entry)
+            if requeued:
+                logger.warning("Failed to flush %d of %d time logs, requeued", len(requeued), len(entries))
+                self._entries = requeued + self._entries
+                self._oldest = oldest
+            TIME_LOG_BUFFER_PENDING.set(len(self._entries))
+
+            self.flushes += 1
+            self.flushed_entries += len(entries) - len(failed) - rejected
+            self.failed_entries += len(failed)
+            self.rejected_entries += rejected
+            self.last_flush_lag = lag
+            self.max_flush_lag = max(self.max_flush_lag, lag)
+
+    async def close(self):
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        await self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "pending_entries": len(self._entries),
+            "parked_entries": len(self.parked),
+            "flushes": self.flushes,
+            "flushed_entries": self.flushed_entries,
+            "failed_entries": self.failed_entries,
+            "rejected_entries": self.rejected_entries,
+            "last_flush_lag_seconds": round(self.last_flush_lag, 4),
+            "max_flush_lag_seconds": round(self.max_flush_lag, 4)
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Employee Management System maintenance commands")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db-name", default="employee_management")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("check-indexes", help="ensure indexes and report queries that scan a whole collection")
+    subparsers.add_parser("migrate-time-logs", help="move time logs embedded in tasks into the time_logs collection")
+    subparsers.add_parser("reconcile-hours", help="recompute task and rollup hour totals from the raw time logs")
+    pending_parser = subparsers.add_parser("count-pending-time-logs",
+                                           help="count the hours of time logs whose counter writes failed")
+    pending_parser.add_argument("--older-than-seconds", type=int, default=300,
+                                help="only take logs stored more than this many seconds ago")
+    archive_parser = subparsers.add_parser("archive-tasks", help="move long-completed tasks into tasks_archive")
+    archive_parser.add_argument("--older-than-days", type=int, default=90,
+                                help="archive tasks completed more than this many days ago")
+    archive_parser.add_argument("--batch-size", type=int, default=1000)
+    subparsers.add_parser("backfill-project-names", help="copy project names onto tasks so task search can match them")
+    args = parser.parse_args(argv)
+
+    task_manager = TaskManager(args.mongo_uri, args.db_name, startup=False)
+
+    if args.command == "check-indexes":
+        if not task_manager.ensure_indexes():
+            return 1
+        collscans = 0
+        for report in task_manager.explain_queries():
+            verdict = "COLLSCAN" if report["collscan"] else "ok"
+            sort = f" sort={report['sort']}" if report["sort"] else ""
+            print(f"[{verdict}] {report['collection']} {report['query']}{sort}: {' <- '.join(report['stages'])}")
+            collscans += report["collscan"]
+        print(f"{collscans} of {len(QUERY_SHAPES)} query shapes use a collection scan")
+        return 1 if collscans else 0
+
+    if args.command == "migrate-time-logs":
+        if not task_manager.ensure_indexes():
+            return 1
+        print(f"Migrated {task_manager.migrate_time_logs()} time logs")
+        return 0
+
+    if args.command == "reconcile-hours":
+        result = task_manager.reconcile_hours()
+        print(f"Corrected total_hours on {result['tasks_corrected']} tasks, rebuilt {result['counters']} hour counters")
+        return 0
+
+    if args.command == "count-pending-time-logs":
+        counted = task_manager.count_pending_time_logs(args.older_than_seconds)
+        print(f"Counted the hours of {counted} pending time logs")
+        return 0
+
+    if args.command == "archive-tasks":
+        if not task_manager.ensure_indexes():
+            return 1
+        archived = task_manager.archive_completed_tasks(args.older_than_days, args.batch_size)
+        print(f"Archived {archived} tasks completed more than {args.older_than_days} days ago")
+        return 0
+
+    if args.command == "backfill-project-names":
+        if not task_manager.ensure_indexes():
+            return 1
+        print(f"Copied project names onto {task_manager.backfill_project_names()} tasks")
+        return 0
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""Load-test and micro-benchmark suite for the API and TaskStore.
+
+Typical run against a local MongoDB, using a dedicated database so real data
+is never touched:
+
+    python benchmark.py seed --employees 200 --tasks 20000 --time-logs 100000
+    MONGO_DB_NAME=employee_management_bench uvicorn fastapi_app:app &
+    python benchmark.py load --concurrency 32 --requests 2000 --output results/load.json
+    python benchmark.py micro --iterations 500 --output results/micro.json
+
+With --backend memory no server is needed: micro and load build an
+in-memory store, fill it with the same generated data, and load drives the
+app in-process through an ASGI transport:
+
+    python benchmark.py --backend memory micro --tasks 20000 --time-logs 100000
+    python benchmark.py --backend memory load --concurrency 32 --requests 2000
+
+Every command prints a table and, with --output, saves JSON results that
+include the git commit, so runs before and after a change can be compared.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from backend import (
+    AsyncTaskManager, Employee, InMemoryTaskManager, Manager, PasswordHasher, Project, Task, TaskManager, TaskStore
+)
+
+BENCH_DB_NAME = "employee_management_bench"
+STATUSES = ["Pending", "In Progress", "Completed"]
+PRIORITIES = ["Low", "Medium", "High"]
+
+def bench_email(role: str, index: int) -> str:
+    return f"bench-{role.lower()}-{index}@example.com"
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """Throughput and latency percentiles, in milliseconds, for one benchmark."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count + errors,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+
+def print_table(results: Dict[str, Dict]):
+    print(f"{'benchmark':<32} {'ops':>7} {'err':>5} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        print(f"{name:<32} {result['requests']:>7} {result['errors']:>5} {result['throughput_per_second']:>10} "
+              f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}")
+
+def save_results(path: Optional[str], kind: str, args: argparse.Namespace, results: Dict[str, Dict]):
+    if not path:
+        return
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    document = {
+        "kind": kind,
+        "started_at": datetime.now().isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("func", "output")},
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {path}")
+
+# Seeding
+async def populate(task_manager: TaskStore, args: argparse.Namespace):
+    """Fill an empty store with reproducible random data through the TaskStore interface."""
+    rng = random.Random(args.seed)
+    # Hash once at the server's work factor so logins neither rehash nor pay for seeding
+    password_hash = PasswordHasher(rounds=args.bcrypt_rounds).hash(args.password)
+    employees = [
+        Manager(i, f"Bench Manager {i}", bench_email("Manager", i), args.password, password_hash=password_hash)
+        for i in range(1, args.managers + 1)
+    ] + [
+        Employee(i, f"Bench Employee {i}", bench_email("Employee", i), args.password, password_hash=password_hash)
+        for i in range(args.managers + 1, args.managers + args.employees + 1)
+    ]
+    for employee in employees:
+        await task_manager.add_employee(employee)
+    employee_ids = [employee.employee_id for employee in employees if employee.role == "Employee"]
+
+    for i in range(1, args.projects + 1):
+        await task_manager.add_project(
+            Project(i, f"Project {i}", f"Benchmark project {i}", rng.randint(1, args.managers))
+        )
+
+    tasks = []
+    for i in range(1, args.tasks + 1):
+        project_id = rng.randint(1, args.projects) if args.projects and rng.random() < 0.8 else None
+        tasks.append(Task(i, f"Task {i}", f"Benchmark task {i} with some description text",
+                          rng.choice(employee_ids), rng.choice(PRIORITIES), rng.choice(STATUSES), project_id))
+    for start in range(0, len(tasks), args.batch_size):
+        await task_manager.add_tasks(tasks[start:start + args.batch_size])
+
+    now = datetime.now()
+    logs = []
+    for _ in range(args.time_logs):
+        task = tasks[rng.randrange(len(tasks))]
+        logs.append({
+            "task_id": task.task_id,
+            "employee_id": task.assigned_to,
+            "hours": rng.choice([0.25, 0.5, 1.0, 1.5, 2.0, 4.0]),
+            "description": "Benchmark work",
+            "logged_at": (now - timedelta(minutes=rng.randint(0, args.days * 24 * 60))).isoformat()
+        })
+        if len(logs) == args.batch_size:
+            await task_manager.add_time_logs(logs)
+            logs = []
+    if logs:
+        await task_manager.add_time_logs(logs)
+
+    await task_manager.seed_counters()
+    print(f"Seeded {len(employees)} employees, {args.projects} projects, {args.tasks} tasks "
+          f"and {args.time_logs} time logs")
+
+def seed(args: argparse.Namespace) -> int:
+    """Drop the benchmark database and fill it with reproducible random data."""
+    if args.backend != "mongo":
+        print("Only the mongo backend keeps seeded data; micro and load seed the memory backend themselves")
+        return 1
+    if args.db_name != BENCH_DB_NAME and not args.force:
+        print(f"Refusing to drop {args.db_name!r}; pass --force to seed a database other than {BENCH_DB_NAME!r}")
+        return 1
+    task_manager = TaskManager(args.mongo_uri, args.db_name, startup=False)
+    task_manager.run(task_manager.client.drop_database(args.db_name))
+    task_manager.ensure_indexes()
+    task_manager.run(populate(task_manager.store, args))
+    task_manager.close()
+    return 0
+
+# Load test against a running API
+async def login(client: httpx.AsyncClient, email: str, password: str) -> Dict:
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()
+
+async def drive(client: httpx.AsyncClient, make_request: Callable, total: int, concurrency: int) -> Dict:
+    """Issue ``total`` requests from ``concurrency`` workers and summarize them."""
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for sequence in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, sequence)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Dict]:
+    if args.backend == "memory":
+        # Serve the app from this process on a fresh in-memory store; settings are read at import time
+        os.environ["STORAGE_BACKEND"] = "memory"
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+        from fastapi_app import app, task_manager
+        async with app.router.lifespan_context(app):
+            await populate(task_manager, args)
+            return await run_scenarios(args, httpx.ASGITransport(app=app), "http://benchmark")
+    return await run_scenarios(args, None, args.base_url)
+
+async def run_scenarios(args: argparse.Namespace, transport: Optional[httpx.AsyncBaseTransport],
+                        base_url: str) -> Dict[str, Dict]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits,
+                                 timeout=args.timeout) as client:
+        # Tokens used by the read and write scenarios are fetched up front and not measured
+        manager = await login(client, bench_email("Manager", 1), args.password)
+        employee_indexes = range(args.managers + 1, args.managers + args.login_pool + 1)
+        employees = await asyncio.gather(*(login(client, bench_email("Employee", i), args.password)
+                                           for i in employee_indexes))
+        employee_tasks = []
+        for employee in employees:
+            response = await client.get("/tasks", params={"limit": 50, "fields": "task_id"},
+                                        headers={"Authorization": f"Bearer {employee['token']}"})
+            employee_tasks.append([task["task_id"] for task in response.json()])
+
+        def auth(user: Dict) -> Dict:
+            return {"Authorization": f"Bearer {user['token']}"}
+
+        def employee_for(sequence: int) -> Dict:
+            return employees[sequence % len(employees)]
+
+        async def post_time_log(client, sequence):
+            tasks = employee_tasks[sequence % len(employees)]
+            if not tasks:
+                raise httpx.HTTPError("employee has no tasks")
+            return await client.post(f"/tasks/{tasks[sequence % len(tasks)]}/time-log",
+                                     json={"hours": 0.25, "description": "benchmark"},
+                                     headers=auth(employee_for(sequence)))
+
+        scenarios = {
+            "POST /auth/login": lambda client, sequence: client.post("/auth/login", json={
+                "email": employee_for(sequence)["email"], "password": args.password
+            }),
+            "GET /tasks (manager)": lambda client, sequence: client.get("/tasks", headers=auth(manager)),
+            "GET /tasks (employee)": lambda client, sequence: client.get("/tasks",
+                                                                        headers=auth(employee_for(sequence))),
+            "GET /dashboard/stats (manager)": lambda client, sequence: client.get("/dashboard/stats",
+                                                                                 headers=auth(manager)),
+            "GET /dashboard/stats (employee)": lambda client, sequence: client.get(
+                "/dashboard/stats", headers=auth(employee_for(sequence))
+            ),
+            "GET /dashboard (employee)": lambda client, sequence: client.get(
+                "/dashboard", params={"task_limit": 5}, headers=auth(employee_for(sequence))
+            ),
+            "POST /tasks/{id}/time-log": post_time_log,
+        }
+        selected = args.scenario or list(scenarios)
+
+        results = {}
+        for name in selected:
+            # Login is bounded by bcrypt, so it gets a smaller share of the requests
+            total = max(args.concurrency, args.requests // 10) if name == "POST /auth/login" else args.requests
+            await drive(client, scenarios[name], min(total, args.warmup), args.concurrency)
+            results[name] = await drive(client, scenarios[name], total, args.concurrency)
+        return results
+
+def load(args: argparse.Namespace) -> int:
+    results = asyncio.run(run_load(args))
+    print_table(results)
+    save_results(args.output, "load", args, results)
+    return 0
+
+# Micro-benchmarks of TaskStore methods, awaited on one event loop as the API does
+async def time_calls(call: Callable[[int], Awaitable], iterations: int, warmup: int) -> Dict:
+    for sequence in range(warmup):
+        await call(sequence)
+    latencies = []
+    start = time.perf_counter()
+    for sequence in range(iterations):
+        call_start = time.perf_counter()
+        await call(sequence)
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, 0, time.perf_counter() - start)
+
+def micro(args: argparse.Namespace) -> int:
+    return asyncio.run(run_micro(args))
+
+async def run_micro(args: argparse.Namespace) -> int:
+    password_hasher = PasswordHasher(rounds=args.bcrypt_rounds)
+    if args.backend == "memory":
+        task_manager = InMemoryTaskManager(password_hasher=password_hasher)
+        await populate(task_manager, args)
+        task_count = args.tasks
+        employee_ids = list(range(args.managers + 1, args.managers + args.employees + 1))
+        project_count = args.projects
+    else:
+        task_manager = AsyncTaskManager(args.mongo_uri, args.db_name, password_hasher=password_hasher)
+        task_count = await task_manager.tasks_collection.estimated_document_count()
+        employee_ids = await task_manager.employees_collection.distinct("employee_id", {"role": "Employee"})
+        project_count = await task_manager.projects_collection.estimated_document_count()
+    if not task_count or not employee_ids:
+        print(f"{args.db_name} holds no tasks or employees; run the seed command first")
+        return 1
+    token = (await task_manager.authenticate_employee(bench_email("Manager", 1), args.password))["token"]
+    rng = random.Random(args.seed)
+
+    def pick_task(_):
+        return rng.randint(1, task_count)
+
+    def pick_employee(_):
+        return rng.choice(employee_ids)
+
+    async def verify_token(_):
+        return task_manager.verify_token(token)
+
+    benchmarks = {
+        "get_task_by_id": lambda s: task_manager.get_task_by_id(pick_task(s)),
+        "check_task_access": lambda s: task_manager.check_task_access(pick_task(s), pick_employee(s)),
+        "get_tasks_by_employee": lambda s: task_manager.get_tasks_by_employee(pick_employee(s), limit=100),
+        "get_all_tasks(limit=100)": lambda s: task_manager.get_all_tasks(limit=100),
+        "get_dashboard_stats(manager)": lambda s: task_manager.get_dashboard_stats(),
+        "get_dashboard_stats(employee)": lambda s: task_manager.get_dashboard_stats(pick_employee(s)),
+        "get_employee_by_id": lambda s: task_manager.get_employee_by_id(pick_employee(s)),
+        "get_all_projects": lambda s: task_manager.get_all_projects(limit=100),
+        "get_employee_time_logs": lambda s: task_manager.get_employee_time_logs(pick_employee(s)),
+        "verify_token": verify_token,
+        "add_time_log": lambda s: task_manager.add_time_log(pick_task(s), pick_employee(s), 0.25, "benchmark"),
+    }
+    if project_count:
+        benchmarks["get_tasks_by_project"] = lambda s: task_manager.get_tasks_by_project(
+            rng.randint(1, project_count), limit=100
+        )
+    selected = args.benchmark or list(benchmarks)
+
+    results = {name: await time_calls(benchmarks[name], args.iterations, args.warmup) for name in selected}
+    print_table(results)
+    save_results(args.output, "micro", args, results)
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Employee Management System benchmarks")
+    parser.add_argument("--backend", choices=["mongo", "memory"], default="mongo",
+                        help="memory runs micro and load on a freshly generated in-process store")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db-name", default=BENCH_DB_NAME)
+    parser.add_argument("--password", default="benchmark", help="password of every seeded account")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="must match the server's BCRYPT_ROUNDS")
+    parser.add_argument("--seed", type=int, default=42, help="random seed, for reproducible data and access patterns")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Shape of the generated data: seeded into MongoDB by seed, or into the memory backend by micro and load
+    data_parser = argparse.ArgumentParser(add_help=False)
+    data_parser.add_argument("--managers", type=int, default=5)
+    data_parser.add_argument("--employees", type=int, default=200)
+    data_parser.add_argument("--projects", type=int, default=50)
+    data_parser.add_argument("--tasks", type=int, default=20000)
+    data_parser.add_argument("--time-logs", type=int, default=100000)
+    data_parser.add_argument("--days", type=int, default=180, help="spread time logs over this many past days")
+    data_parser.add_argument("--batch-size", type=int, default=5000)
+
+    seed_parser = subparsers.add_parser("seed", parents=[data_parser], help="drop and refill the benchmark database")
+    seed_parser.add_argument("--force", action="store_true", help="allow seeding a database with another name")
+    seed_parser.set_defaults(func=seed)
+
+    load_parser = subparsers.add_parser("load", parents=[data_parser], help="drive the API at fixed concurrency")
+    load_parser.add_argument("--base-url", default="http://localhost:8000")
+    load_parser.add_argument("--concurrency", type=int, default=16)
+    load_parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    load_parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests before each scenario")
+    load_parser.add_argument("--timeout", type=float, default=30.0)
+    load_parser.add_argument("--login-pool", type=int, default=20, help="employees whose sessions drive the load")
+    load_parser.add_argument("--scenario", action="append", help="run only this scenario; may be repeated")
+    load_parser.add_argument("--output", help="write JSON results to this file")
+    load_parser.set_defaults(func=load)
+
+    micro_parser = subparsers.add_parser("micro", parents=[data_parser], help="time TaskStore methods directly")
+    micro_parser.add_argument("--iterations", type=int, default=500)
+    micro_parser.add_argument("--warmup", type=int, default=50)
+    micro_parser.add_argument("--benchmark", action="append", help="run only this benchmark; may be repeated")
+    micro_parser.add_argument("--output", help="write JSON results to this file")
+    micro_parser.set_defaults(func=micro)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
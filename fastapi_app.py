@@ -1,11 +1,330 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+import asyncio
+import csv
+import io
+import logging
+import orjson
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from pydantic import BaseModel, Field, field_validator
+from starlette.routing import Match
 from typing import Optional, List
-from backend import TaskManager, Employee, Manager, Task, Project
+from backend import (
+    AsyncTaskManager, CacheMetricsCollector, DashboardEvents, Employee, InMemoryTaskManager, Manager, Task,
+    Project, PasswordHasher, PasswordHasherBusy, TaskAccess, TimeLogWriteBuffer, TTLCache, TASK_FIELDS,
+    EMPLOYEE_FIELDS, PROJECT_FIELDS, REPORT_GROUPS
+)
+
+logger = logging.getLogger(__name__)
+
+# Initialize TaskManager
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+    max_workers=int(os.getenv("BCRYPT_WORKERS", "2")),
+    max_queue=int(os.getenv("BCRYPT_MAX_QUEUE", "32"))
+)
+read_cache = TTLCache(
+    maxsize=int(os.getenv("READ_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("READ_CACHE_TTL_SECONDS", "60"))
+)
+dashboard_events = DashboardEvents(max_queue=int(os.getenv("DASHBOARD_STREAM_MAX_QUEUE", "100")))
+# SLOW_QUERY_MS turns on printing of MongoDB commands slower than that many milliseconds
+slow_query_ms = float(os.getenv("SLOW_QUERY_MS")) if os.getenv("SLOW_QUERY_MS") else None
+
+# MongoDB client settings; each maps to the MongoClient option of the same meaning
+MONGO_CLIENT_ENV = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "MONGO_COMPRESSORS": ("compressors", str),  # e.g. "zstd,snappy,zlib"
+}
+
+def mongo_client_options() -> dict:
+    return {option: cast(os.environ[name]) for name, (option, cast) in MONGO_CLIENT_ENV.items() if os.getenv(name)}
+
+# STORAGE_BACKEND=memory keeps all data in this process (single-worker installs, tests, benchmarks);
+# it is lost on restart and not shared between workers.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+if STORAGE_BACKEND == "memory":
+    task_manager = InMemoryTaskManager(password_hasher=password_hasher, events=dashboard_events)
+elif STORAGE_BACKEND == "mongo":
+    # The client is created in the lifespan hook, so every worker opens its own pool after forking.
+    # MONGO_READ_PREFERENCE applies to list, report and export reads, e.g. secondaryPreferred.
+    task_manager = AsyncTaskManager(os.getenv("MONGO_URI", "mongodb://localhost:27017/"),
+                                    os.getenv("MONGO_DB_NAME", "employee_management"),
+                                    id_block_size=int(os.getenv("ID_BLOCK_SIZE", "1")),
+                                    password_hasher=password_hasher, cache=read_cache, events=dashboard_events,
+                                    slow_query_ms=slow_query_ms, client_options=mongo_client_options(),
+                                    measure_reply_bytes=os.getenv("MONGO_MEASURE_REPLY_BYTES", "0") == "1",
+                                    read_preference=os.getenv("MONGO_READ_PREFERENCE", "primary"), connect=False)
+else:
+    raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}, expected 'mongo' or 'memory'")
+security = HTTPBearer()
+REGISTRY.register(CacheMetricsCollector({"read": read_cache, "token": task_manager.token_cache.verified}))
+
+# Optional write-behind mode for time-log submissions
+time_log_buffer = None
+if os.getenv("TIME_LOG_WRITE_BEHIND", "0") == "1":
+    time_log_buffer = TimeLogWriteBuffer(
+        task_manager,
+        flush_interval_ms=int(os.getenv("TIME_LOG_FLUSH_INTERVAL_MS", "200")),
+        max_entries=int(os.getenv("TIME_LOG_FLUSH_MAX_ENTRIES", "500")),
+        max_attempts=int(os.getenv("TIME_LOG_FLUSH_MAX_ATTEMPTS", "5"))
+    )
+
+# Optional in-process archival of completed tasks; `python backend.py archive-tasks` does the same from cron
+ARCHIVE_COMPLETED_AFTER_DAYS = (int(os.getenv("ARCHIVE_COMPLETED_AFTER_DAYS"))
+                                if os.getenv("ARCHIVE_COMPLETED_AFTER_DAYS") else None)
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+async def archive_completed_tasks_periodically():
+    # Every worker runs this loop, but only the one holding the lease archives. The lease outlives
+    # two intervals, so the holder keeps it while alive and another worker takes over when it dies.
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    while True:
+        try:
+            if await task_manager.acquire_lease("archive_completed_tasks", holder, 2 * ARCHIVE_INTERVAL_SECONDS):
+                archived = await task_manager.archive_completed_tasks(ARCHIVE_COMPLETED_AFTER_DAYS)
+                if archived:
+                    print(f"Archived {archived} tasks completed more than {ARCHIVE_COMPLETED_AFTER_DAYS} days ago")
+        except Exception as e:
+            logger.error("Error archiving completed tasks: %s", e)
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    task_manager.connect()
+    # Refuse to serve rather than hand out ids that may collide or run without the unique indexes
+    if not await task_manager.startup():
+        task_manager.close()
+        raise RuntimeError("Task store startup failed: could not seed the id counters or create the indexes")
+    if time_log_buffer:
+        time_log_buffer.start()
+    archiver = None
+    if ARCHIVE_COMPLETED_AFTER_DAYS is not None:
+        archiver = asyncio.create_task(archive_completed_tasks_periodically())
+    yield
+    if archiver:
+        archiver.cancel()
+        try:
+            await archiver
+        except asyncio.CancelledError:
+            pass
+    if time_log_buffer:
+        await time_log_buffer.close()
+    task_manager.close()
+    password_hasher.close()
+
+# Backend methods return JSON-ready documents (no _id, no BSON types), so responses can be
+# dumped by orjson as they are. Handlers for large payloads return ORJSONResponse themselves
+# to also skip FastAPI's per-object jsonable_encoder pass.
+app = FastAPI(title="Employee Management System", version="1.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to serve an HTTP request, until its last byte", ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method", "route"]
+)
+
+def route_template(scope) -> str:
+    # Label by route path template, never the raw URL, to keep metric cardinality bounded.
+    # Remembered in the scope, which every middleware layer shares.
+    if "route_template" not in scope:
+        scope["route_template"] = next(
+            (route.path for route in app.router.routes if route.matches(scope)[0] == Match.FULL), "unmatched"
+        )
+    return scope["route_template"]
+
+class MetricsMiddleware:
+    # Plain ASGI middleware, so streamed responses are timed until their final chunk.
+    # Event streams stay open indefinitely and only count towards in-flight requests.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], route_template(scope)
+        response = {"status": 500, "stream": False}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["stream"] = any(name == b"content-type" and value.startswith(b"text/event-stream")
+                                         for name, value in message.get("headers", []))
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            if not response["stream"]:
+                HTTP_REQUEST_SECONDS.labels(method, route, str(response["status"])).observe(
+                    time.perf_counter() - start
+                )
+
+# Admission control: expensive routes are grouped into classes, each with its own concurrency limit,
+# bounded wait queue and queueing deadline. A spike of logins (bcrypt) or dashboards (aggregations over
+# all tasks) is then shed with a fast 503 instead of piling up and slowing every other route. Routes
+# without a class, like task reads, are never queued. Limits apply per worker process.
+ROUTE_CLASSES = {
+    ("POST", "/auth/login"): "auth",
+    ("POST", "/auth/register"): "auth",
+    ("GET", "/dashboard"): "analytics",
+    ("GET", "/dashboard/stats"): "analytics",
+    ("GET", "/reports/hours"): "analytics",
+    ("GET", "/reports/employees/{employee_id}/hours"): "analytics",
+    ("GET", "/reports/projects/{project_id}/hours"): "analytics",
+    ("GET", "/tasks/search"): "search",
+    ("GET", "/export/tasks"): "export",
+    ("GET", "/export/time-logs"): "export",
+    ("GET", "/export/employees"): "export",
+}
+
+# Default (concurrency, max queued requests, max queueing time in ms) per route class. Each can be
+# overridden with ADMISSION_<CLASS>_CONCURRENCY, _MAX_QUEUE and _MAX_WAIT_MS; a concurrency of 0 turns
+# the limit off. Exports hold their slot until the whole stream is sent.
+ADMISSION_DEFAULTS = {
+    "auth": (4, 32, 2000),
+    "analytics": (8, 16, 1000),
+    "search": (8, 32, 500),
+    "export": (2, 4, 1000),
+}
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "http_admission_in_flight", "Admitted requests currently being served", ["route_class"]
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "http_admission_queue_depth", "Requests waiting for an admission slot", ["route_class"]
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "http_admission_wait_seconds", "Time spent waiting for an admission slot", ["route_class"]
+)
+ADMISSION_REJECTIONS = Counter(
+    "http_admission_rejections_total", "Requests shed with a 503", ["route_class", "reason"]
+)
 
-app = FastAPI(title="Employee Management System", version="1.0.0")
+class AdmissionLimit:
+    """At most ``concurrency`` requests at once, ``max_queue`` more waiting in FIFO order.
+
+    A waiting request gives up after ``max_wait`` seconds. All state is
+    touched from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, route_class: str, concurrency: int, max_queue: int, max_wait: float):
+        self.route_class = route_class
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiters = deque()
+        self.in_flight = ADMISSION_IN_FLIGHT.labels(route_class)
+        self.queue_depth = ADMISSION_QUEUE_DEPTH.labels(route_class)
+        self.in_flight.set(0)
+        self.queue_depth.set(0)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns the reason the request was rejected, or None once admitted."""
+        if self.active < self.concurrency and not self.waiters:
+            self.active += 1
+            self.in_flight.set(self.active)
+            return None
+        if len(self.waiters) >= self.max_queue:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.queue_depth.set(len(self.waiters))
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+            return None
+        except asyncio.TimeoutError:
+            # release() may have handed over the slot just as the deadline passed
+            return None if waiter.done() and not waiter.cancelled() else "timeout"
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            self.queue_depth.set(len(self.waiters))
+
+    def release(self):
+        # Hand the slot straight to the oldest waiter still interested, so it can not be overtaken
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.queue_depth.set(len(self.waiters))
+                return
+        self.active -= 1
+        self.in_flight.set(self.active)
+
+def admission_limits() -> dict:
+    limits = {}
+    for route_class, (concurrency, max_queue, max_wait_ms) in ADMISSION_DEFAULTS.items():
+        prefix = f"ADMISSION_{route_class.upper()}"
+        concurrency = int(os.getenv(f"{prefix}_CONCURRENCY", concurrency))
+        if concurrency > 0:
+            limits[route_class] = AdmissionLimit(route_class, concurrency,
+                                                 int(os.getenv(f"{prefix}_MAX_QUEUE", max_queue)),
+                                                 float(os.getenv(f"{prefix}_MAX_WAIT_MS", max_wait_ms)) / 1000)
+    return limits
+
+class AdmissionMiddleware:
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http":
+            limit = self.limits.get(ROUTE_CLASSES.get((scope["method"], route_template(scope))))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        rejection = await limit.acquire()
+        ADMISSION_WAIT_SECONDS.labels(limit.route_class).observe(time.perf_counter() - start)
+        if rejection:
+            ADMISSION_REJECTIONS.labels(limit.route_class, rejection).inc()
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry shortly"},
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+# Middleware added last runs first: metrics see every request, including shed ones, and the
+# 503s from admission control still carry CORS headers.
+app.add_middleware(AdmissionMiddleware, limits=admission_limits())
 
 # Add CORS middleware
 app.add_middleware(
@@ -14,11 +333,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After", "X-Next-Offset", "Retry-After"],
 )
 
-# Initialize TaskManager
-task_manager = TaskManager()
-security = HTTPBearer()
+app.add_middleware(MetricsMiddleware)
+
+# List endpoints return at most this many items per page by default
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Ranked search results are paged by offset; deep offsets make MongoDB score and sort every match
+MAX_SEARCH_OFFSET = 10000
+MAX_SEARCH_QUERY_LENGTH = 200
+
+# Upper bound on the number of items accepted by a single bulk request
+MAX_BULK_ITEMS = 10000
+
+# Idle dashboard streams send a comment this often so proxies keep them open
+DASHBOARD_STREAM_KEEPALIVE_SECONDS = 15
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"}
+    )
 
 # Pydantic models
 class EmployeeCreate(BaseModel):
@@ -42,8 +382,9 @@ class TaskUpdate(BaseModel):
     status: str
 
 class TimeLogCreate(BaseModel):
-    hours: float
+    hours: float = Field(gt=0, allow_inf_nan=False)
     description: str = ""
+    log_id: Optional[str] = None  # Client-chosen id that makes retries safe; generated when omitted
 
 class ProjectCreate(BaseModel):
     name: str
@@ -52,6 +393,109 @@ class ProjectCreate(BaseModel):
 class TaskProjectUpdate(BaseModel):
     project_id: Optional[int]
 
+class TaskStatusBulkUpdate(BaseModel):
+    task_id: int
+    status: str
+
+# How far ahead of this server's clock an imported logged_at may be
+LOGGED_AT_MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+class TimeLogBulkCreate(BaseModel):
+    task_id: int
+    hours: float = Field(gt=0, allow_inf_nan=False)
+    description: str = ""
+    employee_id: Optional[int] = None  # Managers may log on behalf of others; defaults to the caller
+    logged_at: Optional[datetime] = None
+    log_id: Optional[str] = None
+
+    @field_validator("logged_at")
+    @classmethod
+    def normalize_logged_at(cls, logged_at: Optional[datetime]) -> Optional[datetime]:
+        # Stored timestamps are naive server-local time, so they sort and bucket by day like datetime.now()
+        if logged_at is None:
+            return None
+        if logged_at.tzinfo is not None:
+            logged_at = logged_at.astimezone().replace(tzinfo=None)
+        if logged_at > datetime.now() + LOGGED_AT_MAX_CLOCK_SKEW:
+            raise ValueError("logged_at is in the future")
+        return logged_at
+
+# Pagination helpers
+def parse_fields(fields: Optional[str], allowed: set) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def next_page_headers(items: List[dict], key: str, limit: int) -> dict:
+    # A full page means there may be more; the client resumes with ?after=<X-Next-After>.
+    if len(items) == limit:
+        return {"X-Next-After": str(items[-1][key])}
+    return {}
+
+def paginate(items: List[dict], key: str, limit: int) -> ORJSONResponse:
+    return ORJSONResponse(items, headers=next_page_headers(items, key, limit))
+
+# Export helpers
+EXPORT_COLUMNS = {
+    "tasks": ["task_id", "title", "description", "assigned_to", "priority", "status",
+              "project_id", "created_at", "updated_at", "total_hours"],
+    "time-logs": ["task_id", "employee_id", "hours", "description", "logged_at"],
+    "employees": ["employee_id", "name", "email", "role", "created_at"],
+}
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+async def encode_export(batches, export_format: str, columns: List[str]):
+    # Encode one cursor batch at a time so memory stays flat however large the export is
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        yield buffer.getvalue()
+        async for batch in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(batch)
+            yield buffer.getvalue()
+    else:
+        async for batch in batches:
+            yield b"".join(orjson.dumps(doc, default=str) + b"\n" for doc in batch)
+
+def export_response(batches, name: str, export_format: str) -> StreamingResponse:
+    return StreamingResponse(
+        encode_export(batches, export_format, EXPORT_COLUMNS[name]),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
+
+def check_bulk_size(items: list):
+    if not items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request")
+
+# Maps a failed TaskAccess outcome to the HTTP error it produces
+def raise_for_access(access: TaskAccess, failure_detail: str):
+    if access is TaskAccess.NOT_FOUND:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if access is TaskAccess.FORBIDDEN:
+        raise HTTPException(status_code=403, detail="Access denied")
+    if access is TaskAccess.ARCHIVED:
+        raise HTTPException(status_code=409, detail="Task is archived and read-only")
+    if access is not TaskAccess.OK:
+        raise HTTPException(status_code=400, detail=failure_detail)
+
+# Employees may only touch tasks assigned to them; managers are unrestricted
+def task_assignee_scope(current_user) -> Optional[int]:
+    return None if current_user["role"] == "Manager" else current_user["employee_id"]
+
 # Auth dependency
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
@@ -76,42 +520,55 @@ async def get_current_manager(current_user = Depends(get_current_user)):
 # Authentication endpoints
 @app.post("/auth/register")
 async def register_employee(employee_data: EmployeeCreate):
-    employee_id = task_manager.get_next_employee_id()
+    password_hash = await task_manager.hash_password(employee_data.password)
+    employee_id = await task_manager.get_next_employee_id()
     
     if employee_data.role == "Manager":
-        employee = Manager(employee_id, employee_data.name, employee_data.email, employee_data.password)
+        employee = Manager(employee_id, employee_data.name, employee_data.email, employee_data.password,
+                           password_hash=password_hash)
     else:
-        employee = Employee(employee_id, employee_data.name, employee_data.email, employee_data.password)
+        employee = Employee(employee_id, employee_data.name, employee_data.email, employee_data.password,
+                            password_hash=password_hash)
     
-    if task_manager.add_employee(employee):
+    if await task_manager.add_employee(employee):
         return {"message": "Employee registered successfully", "employee_id": employee_id}
     else:
         raise HTTPException(status_code=400, detail="Employee already exists")
 
 @app.post("/auth/login")
 async def login_employee(login_data: EmployeeLogin):
-    auth_result = task_manager.authenticate_employee(login_data.email, login_data.password)
+    auth_result = await task_manager.authenticate_employee(login_data.email, login_data.password)
     if auth_result:
         return auth_result
     else:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+@app.post("/auth/logout")
+async def logout_employee(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    if task_manager.revoke_token(credentials.credentials):
+        return {"message": "Logged out successfully"}
+    else:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
 # Employee endpoints
 @app.get("/employees/me")
 async def get_current_employee_info(current_user = Depends(get_current_user)):
-    employee = task_manager.get_employee_by_id(current_user["employee_id"])
+    employee = await task_manager.get_employee_by_id(current_user["employee_id"])
     if employee:
         return employee
     else:
         raise HTTPException(status_code=404, detail="Employee not found")
 
 @app.get("/employees")
-async def get_all_employees(current_user = Depends(get_current_manager)):
-    return task_manager.get_all_employees()
+async def get_all_employees(after: Optional[int] = None,
+                            limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                            fields: Optional[str] = None, current_user = Depends(get_current_manager)):
+    employees = await task_manager.get_all_employees(after, limit, parse_fields(fields, EMPLOYEE_FIELDS))
+    return paginate(employees, "employee_id", limit)
 
 @app.get("/employees/{employee_id}")
 async def get_employee(employee_id: int, current_user = Depends(get_current_manager)):
-    employee = task_manager.get_employee_by_id(employee_id)
+    employee = await task_manager.get_employee_by_id(employee_id)
     if employee:
         return employee
     else:
@@ -120,7 +577,7 @@ async def get_employee(employee_id: int, current_user = Depends(get_current_mana
 # Task endpoints
 @app.post("/tasks")
 async def create_task(task_data: TaskCreate, current_user = Depends(get_current_manager)):
-    task_id = task_manager.get_next_task_id()
+    task_id = await task_manager.get_next_task_id()
     task = Task(
         task_id=task_id,
         title=task_data.title,
@@ -130,21 +587,103 @@ async def create_task(task_data: TaskCreate, current_user = Depends(get_current_
         project_id=task_data.project_id
     )
     
-    if task_manager.add_task(task):
+    if await task_manager.add_task(task):
         return {"message": "Task created successfully", "task_id": task_id}
     else:
         raise HTTPException(status_code=400, detail="Task already exists")
 
+@app.post("/tasks/bulk")
+async def create_tasks_bulk(tasks_data: List[TaskCreate], current_user = Depends(get_current_manager)):
+    check_bulk_size(tasks_data)
+    task_ids = await task_manager.reserve_task_ids(len(tasks_data))
+    tasks = [
+        Task(
+            task_id=task_id,
+            title=task_data.title,
+            description=task_data.description,
+            assigned_to=task_data.assigned_to,
+            priority=task_data.priority,
+            project_id=task_data.project_id
+        )
+        for task_id, task_data in zip(task_ids, tasks_data)
+    ]
+    return {"results": await task_manager.add_tasks(tasks)}
+
+@app.put("/tasks/bulk/status")
+async def update_task_status_bulk(updates: List[TaskStatusBulkUpdate], current_user = Depends(get_current_user)):
+    check_bulk_size(updates)
+    results = await task_manager.update_task_statuses(
+        [{"task_id": update.task_id, "status": update.status} for update in updates],
+        task_assignee_scope(current_user)
+    )
+    return {"results": results}
+
+@app.post("/time-logs/bulk")
+async def add_time_logs_bulk(time_logs: List[TimeLogBulkCreate], current_user = Depends(get_current_user)):
+    check_bulk_size(time_logs)
+    if current_user["role"] != "Manager" and any(
+        log.employee_id not in (None, current_user["employee_id"]) for log in time_logs
+    ):
+        raise HTTPException(status_code=403, detail="Employees can only log their own time")
+    entries = [
+        {
+            "task_id": log.task_id,
+            "employee_id": current_user["employee_id"] if log.employee_id is None else log.employee_id,
+            "hours": log.hours,
+            "description": log.description,
+            "logged_at": log.logged_at.isoformat() if log.logged_at else None,
+            "log_id": log.log_id
+        }
+        for log in time_logs
+    ]
+    return {"results": await task_manager.add_time_logs(entries, task_assignee_scope(current_user))}
+
 @app.get("/tasks")
-async def get_tasks(current_user = Depends(get_current_user)):
+async def get_tasks(after: Optional[int] = None,
+                    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), fields: Optional[str] = None,
+                    task_status: Optional[str] = Query(None, alias="status"), priority: Optional[str] = None,
+                    assigned_to: Optional[int] = None, archived: bool = False,
+                    current_user = Depends(get_current_user)):
+    # archived=true also pages through tasks moved to the archive
+    fields = parse_fields(fields, TASK_FIELDS)
     if current_user["role"] == "Manager":
-        return task_manager.get_all_tasks()
+        tasks = await task_manager.get_all_tasks(after, limit, fields, task_status, priority, assigned_to, archived)
     else:
-        return task_manager.get_tasks_by_employee(current_user["employee_id"])
+        tasks = await task_manager.get_tasks_by_employee(current_user["employee_id"], after, limit, fields,
+                                                         task_status, priority, archived)
+    return paginate(tasks, "task_id", limit)
+
+@app.get("/tasks/without-project")
+async def get_tasks_without_project(after: Optional[int] = None,
+                                    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                    fields: Optional[str] = None,
+                                    task_status: Optional[str] = Query(None, alias="status"),
+                                    priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                                    archived: bool = False, current_user = Depends(get_current_manager)):
+    tasks = await task_manager.get_tasks_without_project(after, limit, parse_fields(fields, TASK_FIELDS),
+                                                         task_status, priority, assigned_to, archived)
+    return paginate(tasks, "task_id", limit)
+
+@app.get("/tasks/search")
+async def search_tasks(q: str = Query(..., min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH),
+                       offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+                       limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), fields: Optional[str] = None,
+                       task_status: Optional[str] = Query(None, alias="status"), priority: Optional[str] = None,
+                       assigned_to: Optional[int] = None, project_id: Optional[int] = None,
+                       current_user = Depends(get_current_user)):
+    # Best match first; employees only ever see their own tasks
+    if current_user["role"] != "Manager":
+        assigned_to = current_user["employee_id"]
+    tasks = await task_manager.search_tasks(q, offset, limit, parse_fields(fields, TASK_FIELDS), task_status,
+                                            priority, assigned_to, project_id)
+    # Scores are not a stable key, so the next page is addressed by ?offset=<X-Next-Offset>
+    more = len(tasks) == limit and offset + limit <= MAX_SEARCH_OFFSET
+    headers = {"X-Next-Offset": str(offset + limit)} if more else {}
+    return ORJSONResponse(tasks, headers=headers)
 
 @app.get("/tasks/{task_id}")
-async def get_task(task_id: int, current_user = Depends(get_current_user)):
-    task = task_manager.get_task_by_id(task_id)
+async def get_task(task_id: int, archived: bool = False, current_user = Depends(get_current_user)):
+    task = await task_manager.get_task_by_id(task_id, archived)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -156,58 +695,66 @@ async def get_task(task_id: int, current_user = Depends(get_current_user)):
 
 @app.put("/tasks/{task_id}/status")
 async def update_task_status(task_id: int, task_update: TaskUpdate, current_user = Depends(get_current_user)):
-    task = task_manager.get_task_by_id(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check if employee can update this task
-    if current_user["role"] != "Manager" and task["assigned_to"] != current_user["employee_id"]:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    if task_manager.update_task_status(task_id, task_update.status):
-        return {"message": "Task status updated successfully"}
-    else:
-        raise HTTPException(status_code=400, detail="Failed to update task status")
+    # The assignee check and the update happen in a single atomic operation
+    access = await task_manager.update_task_status(task_id, task_update.status, task_assignee_scope(current_user))
+    raise_for_access(access, "Failed to update task status")
+    return {"message": "Task status updated successfully"}
 
 @app.post("/tasks/{task_id}/time-log")
-async def add_time_log(task_id: int, time_log: TimeLogCreate, current_user = Depends(get_current_user)):
-    task = task_manager.get_task_by_id(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check if employee can log time for this task
-    if current_user["role"] != "Manager" and task["assigned_to"] != current_user["employee_id"]:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    if task_manager.add_time_log(task_id, current_user["employee_id"], time_log.hours, time_log.description):
-        return {"message": "Time log added successfully"}
-    else:
-        raise HTTPException(status_code=400, detail="Failed to add time log")
+async def add_time_log(task_id: int, time_log: TimeLogCreate, response: Response,
+                       current_user = Depends(get_current_user)):
+    log_id = time_log.log_id or uuid.uuid4().hex
+    if time_log_buffer:
+        # Validate now, acknowledge, and leave the write to the next batch flush
+        access = await task_manager.check_task_access(task_id, task_assignee_scope(current_user))
+        raise_for_access(access, "Failed to add time log")
+        time_log_buffer.submit({
+            "task_id": task_id,
+            "employee_id": current_user["employee_id"],
+            "hours": time_log.hours,
+            "description": time_log.description,
+            "logged_at": datetime.now().isoformat(),
+            "log_id": log_id
+        })
+        response.status_code = 202
+        return {"message": "Time log queued", "log_id": log_id}
+
+    access = await task_manager.add_time_log(task_id, current_user["employee_id"], time_log.hours,
+                                             time_log.description, task_assignee_scope(current_user), log_id)
+    raise_for_access(access, "Failed to add time log")
+    return {"message": "Time log added successfully", "log_id": log_id}
 
 @app.get("/tasks/{task_id}/time-logs")
-async def get_task_time_logs(task_id: int, current_user = Depends(get_current_user)):
-    task = task_manager.get_task_by_id(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check if employee can access this task
-    if current_user["role"] != "Manager" and task["assigned_to"] != current_user["employee_id"]:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    return task.get("time_logs", [])
+async def get_task_time_logs(task_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                             archived: bool = False, current_user = Depends(get_current_user)):
+    access, time_logs = await task_manager.get_task_time_logs_for(task_id, task_assignee_scope(current_user),
+                                                                  start, end, archived)
+    raise_for_access(access, "Failed to get time logs")
+    return ORJSONResponse(time_logs)
 
 @app.get("/employees/{employee_id}/time-logs")
-async def get_employee_time_logs(employee_id: int, current_user = Depends(get_current_user)):
+async def get_employee_time_logs(employee_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                 current_user = Depends(get_current_user)):
     # Employees can only see their own logs, managers can see all
     if current_user["role"] != "Manager" and current_user["employee_id"] != employee_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return task_manager.get_employee_time_logs(employee_id)
+    return ORJSONResponse(await task_manager.get_employee_time_logs(employee_id, start, end))
+
+@app.get("/time-logs/write-behind")
+async def get_time_log_buffer_stats(current_user = Depends(get_current_manager)):
+    if not time_log_buffer:
+        return {"enabled": False}
+    return {"enabled": True, **time_log_buffer.stats()}
+
+@app.get("/cache/stats")
+async def get_cache_stats(current_user = Depends(get_current_manager)):
+    return task_manager.cache_stats()
 
 # Project endpoints
 @app.post("/projects")
 async def create_project(project_data: ProjectCreate, current_user = Depends(get_current_manager)):
-    project_id = task_manager.get_next_project_id()
+    project_id = await task_manager.get_next_project_id()
     project = Project(
         project_id=project_id,
         name=project_data.name,
@@ -215,64 +762,187 @@ async def create_project(project_data: ProjectCreate, current_user = Depends(get
         created_by=current_user["employee_id"]
     )
     
-    if task_manager.add_project(project):
+    if await task_manager.add_project(project):
         return {"message": "Project created successfully", "project_id": project_id}
     else:
         raise HTTPException(status_code=400, detail="Project already exists")
 
 @app.get("/projects")
-async def get_all_projects(current_user = Depends(get_current_user)):
-    return task_manager.get_all_projects()
+async def get_all_projects(after: Optional[int] = None,
+                           limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                           fields: Optional[str] = None, current_user = Depends(get_current_user)):
+    projects = await task_manager.get_all_projects(after, limit, parse_fields(fields, PROJECT_FIELDS))
+    return paginate(projects, "project_id", limit)
 
 @app.get("/projects/{project_id}")
 async def get_project(project_id: int, current_user = Depends(get_current_user)):
-    project = task_manager.get_project_by_id(project_id)
+    project = await task_manager.get_project_by_id(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 @app.get("/projects/{project_id}/tasks")
-async def get_project_tasks(project_id: int, current_user = Depends(get_current_user)):
-    project = task_manager.get_project_by_id(project_id)
+async def get_project_tasks(project_id: int, after: Optional[int] = None,
+                            limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                            fields: Optional[str] = None, task_status: Optional[str] = Query(None, alias="status"),
+                            priority: Optional[str] = None, assigned_to: Optional[int] = None,
+                            archived: bool = False, current_user = Depends(get_current_user)):
+    project = await task_manager.get_project_by_id(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    tasks = task_manager.get_tasks_by_project(project_id)
-    
-    # Filter tasks for employees (only their assigned tasks)
+    # Employees only see their assigned tasks; the restriction is part of the query
     if current_user["role"] != "Manager":
-        tasks = [task for task in tasks if task["assigned_to"] == current_user["employee_id"]]
+        assigned_to = current_user["employee_id"]
     
-    return tasks
+    tasks = await task_manager.get_tasks_by_project(project_id, after, limit, parse_fields(fields, TASK_FIELDS),
+                                                    task_status, priority, assigned_to, archived)
+    return paginate(tasks, "task_id", limit)
 
 @app.put("/tasks/{task_id}/project")
 async def update_task_project(task_id: int, update_data: TaskProjectUpdate, current_user = Depends(get_current_manager)):
-    task = task_manager.get_task_by_id(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
     # Validate project exists if project_id is provided
     if update_data.project_id is not None:
-        project = task_manager.get_project_by_id(update_data.project_id)
+        project = await task_manager.get_project_by_id(update_data.project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
     
-    if task_manager.update_task_project(task_id, update_data.project_id):
-        return {"message": "Task project updated successfully"}
-    else:
-        raise HTTPException(status_code=400, detail="Failed to update task project")
-
-@app.get("/tasks/without-project")
-async def get_tasks_without_project(current_user = Depends(get_current_manager)):
-    return task_manager.get_tasks_without_project()
+    access = await task_manager.update_task_project(task_id, update_data.project_id)
+    raise_for_access(access, "Failed to update task project")
+    return {"message": "Task project updated successfully"}
+
+# Export endpoints
+@app.get("/export/tasks")
+async def export_tasks(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                       start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       project_id: Optional[int] = None, archived: bool = False,
+                       current_user = Depends(get_current_manager)):
+    return export_response(task_manager.iter_tasks(start, end, project_id, include_archived=archived), "tasks",
+                           export_format)
+
+@app.get("/export/time-logs")
+async def export_time_logs(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                           start: Optional[datetime] = None, end: Optional[datetime] = None,
+                           project_id: Optional[int] = None, current_user = Depends(get_current_manager)):
+    return export_response(task_manager.iter_time_logs(start, end, project_id), "time-logs", export_format)
+
+@app.get("/export/employees")
+async def export_employees(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                           current_user = Depends(get_current_manager)):
+    return export_response(task_manager.iter_employees(), "employees", export_format)
+
+# Report endpoints
+DEFAULT_REPORT_DAYS = 30
+MAX_REPORT_DAYS = 366 * 2
+
+async def hours_report(current_user: dict, start: Optional[date], end: Optional[date], period: str,
+                       group_by: Optional[str], employee_id: Optional[int] = None,
+                       project_id: Optional[int] = None) -> dict:
+    # end is exclusive; by default report the last DEFAULT_REPORT_DAYS days including today
+    end = end or date.today() + timedelta(days=1)
+    start = start or end - timedelta(days=DEFAULT_REPORT_DAYS)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start).days > MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Report range is limited to {MAX_REPORT_DAYS} days")
+
+    # Employees only ever see their own hours, whatever filters they pass
+    if current_user["role"] != "Manager":
+        if employee_id is not None and employee_id != current_user["employee_id"]:
+            raise HTTPException(status_code=403, detail="Access denied")
+        employee_id = current_user["employee_id"]
+
+    groups = parse_fields(group_by, set(REPORT_GROUPS))
+    rows = await task_manager.get_hours_report(start, end, period, groups, employee_id, project_id)
+    return ORJSONResponse({"start": start.isoformat(), "end": end.isoformat(), "period": period, "rows": rows})
+
+@app.get("/reports/hours")
+async def get_hours_report(start: Optional[date] = None, end: Optional[date] = None,
+                           period: str = Query("day", pattern="^(day|week|month)$"),
+                           group_by: Optional[str] = None, employee_id: Optional[int] = None,
+                           project_id: Optional[int] = None, current_user = Depends(get_current_user)):
+    return await hours_report(current_user, start, end, period, group_by, employee_id, project_id)
+
+@app.get("/reports/employees/{employee_id}/hours")
+async def get_employee_hours_report(employee_id: int, start: Optional[date] = None, end: Optional[date] = None,
+                                    period: str = Query("week", pattern="^(day|week|month)$"),
+                                    group_by: Optional[str] = None, current_user = Depends(get_current_user)):
+    return await hours_report(current_user, start, end, period, group_by, employee_id=employee_id)
+
+@app.get("/reports/projects/{project_id}/hours")
+async def get_project_hours_report(project_id: int, start: Optional[date] = None, end: Optional[date] = None,
+                                   period: str = Query("week", pattern="^(day|week|month)$"),
+                                   group_by: Optional[str] = None, current_user = Depends(get_current_user)):
+    return await hours_report(current_user, start, end, period, group_by, project_id=project_id)
 
 # Dashboard endpoints
+@app.get("/dashboard")
+async def get_dashboard(task_after: Optional[int] = None,
+                        task_limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                        task_fields: Optional[str] = None,
+                        project_limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                        project_fields: Optional[str] = None, current_user = Depends(get_current_user)):
+    # Everything the dashboard renders in one round trip; X-Next-After pages the task list
+    employee_id = None if current_user["role"] == "Manager" else current_user["employee_id"]
+    dashboard = await task_manager.get_dashboard(
+        employee_id, task_after, task_limit, parse_fields(task_fields, TASK_FIELDS),
+        project_limit, parse_fields(project_fields, PROJECT_FIELDS)
+    )
+    return ORJSONResponse(dashboard, headers=next_page_headers(dashboard["tasks"], "task_id", task_limit))
+
+@app.get("/dashboard/stream")
+async def stream_dashboard(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security),
+                           current_user = Depends(get_current_user)):
+    # Server-Sent Events carrying small deltas (task_added, task_status, time_logged, task_project)
+    # for the tasks this user can see; a "resync" event means the client should refetch /dashboard.
+    employee_id = None if current_user["role"] == "Manager" else current_user["employee_id"]
+
+    async def event_stream():
+        queue = dashboard_events.subscribe(employee_id)
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), DASHBOARD_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Close streams whose client went away or whose token expired or was revoked
+                    if await request.is_disconnected() or task_manager.verify_token(credentials.credentials) is None:
+                        break
+                    yield b": keep-alive\n\n"
+                    continue
+                yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+        finally:
+            dashboard_events.unsubscribe(queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/dashboard/stream/stats")
+async def get_dashboard_stream_stats(current_user = Depends(get_current_manager)):
+    return dashboard_events.stats()
+
 @app.get("/dashboard/stats")
 async def get_dashboard_stats(current_user = Depends(get_current_user)):
     if current_user["role"] == "Manager":
-        return task_manager.get_dashboard_stats()
+        return await task_manager.get_dashboard_stats()
     else:
-        return task_manager.get_dashboard_stats(current_user["employee_id"])
+        return await task_manager.get_dashboard_stats(current_user["employee_id"])
+
+# Readiness fails once this share of the MongoDB connection pool is checked out
+READINESS_MAX_POOL_SATURATION = float(os.getenv("READINESS_MAX_POOL_SATURATION", "0.9"))
+
+@app.get("/health/ready", include_in_schema=False)
+async def readiness():
+    # For load balancers: take the worker out of rotation while MongoDB is unreachable or the pool is exhausted
+    mongo_ok = await task_manager.ping()
+    pool = task_manager.pool_stats()
+    ready = mongo_ok and pool["saturation"] < READINESS_MAX_POOL_SATURATION
+    return ORJSONResponse({"ready": ready, "mongo": mongo_ok, "pool": pool},
+                          status_code=200 if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/")
 async def root():
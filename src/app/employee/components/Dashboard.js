@@ -3,6 +3,99 @@
 import { useState, useEffect } from 'react';
 import styles from './Dashboard.module.css';
 
+const RECENT_TASK_LIMIT = 5;
+const STREAM_RETRY_MS = 5000;
+
+const STATUS_COUNT_KEYS = {
+  'Pending': 'pending_tasks',
+  'In Progress': 'in_progress_tasks',
+  'Completed': 'completed_tasks',
+};
+
+const roundHours = (hours) => Math.round(hours * 100) / 100;
+
+const withCompletionRate = (stats) => {
+  const rate = stats.total_tasks > 0 ? (stats.completed_tasks / stats.total_tasks) * 100 : 0;
+  return { ...stats, completion_rate: Math.round(rate * 10) / 10 };
+};
+
+// Fold one dashboard stream event into the stats shown in the cards
+const applyStatsEvent = (stats, event, user) => {
+  if (!stats) return stats;
+  const next = { ...stats, priority_breakdown: { ...stats.priority_breakdown } };
+  switch (event.type) {
+    case 'task_added': {
+      const statusKey = STATUS_COUNT_KEYS[event.task.status];
+      const priority = event.task.priority?.toLowerCase();
+      next.total_tasks = (next.total_tasks || 0) + 1;
+      if (statusKey) next[statusKey] = (next[statusKey] || 0) + 1;
+      if (priority in next.priority_breakdown) next.priority_breakdown[priority] += 1;
+      return withCompletionRate(next);
+    }
+    case 'task_status': {
+      const fromKey = STATUS_COUNT_KEYS[event.previous_status];
+      const toKey = STATUS_COUNT_KEYS[event.status];
+      if (fromKey) next[fromKey] = Math.max(0, (next[fromKey] || 0) - 1);
+      if (toKey) next[toKey] = (next[toKey] || 0) + 1;
+      return withCompletionRate(next);
+    }
+    case 'time_logged':
+      // An employee's hour total counts the hours they logged themselves
+      if (user.role === 'Manager' || event.employee_id === user.employee_id) {
+        next.total_hours = roundHours((next.total_hours || 0) + event.hours);
+      }
+      return next;
+    default:
+      return stats;
+  }
+};
+
+// Fold one dashboard stream event into the recent task list
+const applyTaskEvent = (tasks, event) => {
+  switch (event.type) {
+    case 'task_added':
+      return tasks.length < RECENT_TASK_LIMIT ? [...tasks, event.task] : tasks;
+    case 'task_status':
+      return tasks.map(task => task.task_id === event.task_id ? { ...task, status: event.status } : task);
+    case 'time_logged':
+      return tasks.map(task => task.task_id === event.task_id
+        ? { ...task, total_hours: roundHours((task.total_hours || 0) + event.hours) }
+        : task);
+    default:
+      return tasks;
+  }
+};
+
+// EventSource cannot send an Authorization header, so read the SSE stream through fetch
+const readDashboardStream = async (token, signal, onEvent) => {
+  const response = await fetch('/api/dashboard/stream', {
+    headers: { 'Authorization': `Bearer ${token}` },
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Dashboard stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += value;
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const data = frame
+        .split('\n')
+        .filter(line => line.startsWith('data: '))
+        .map(line => line.slice(6))
+        .join('\n');
+      if (data) onEvent(JSON.parse(data));
+    }
+  }
+};
+
 export default function Dashboard({ user }) {
   const [stats, setStats] = useState(null);
   const [recentTasks, setRecentTasks] = useState([]);
@@ -13,26 +106,55 @@ export default function Dashboard({ user }) {
     fetchDashboardData();
   }, []);
 
+  // Keep the numbers live with small deltas instead of refetching the whole dashboard
+  useEffect(() => {
+    const controller = new AbortController();
+    const token = localStorage.getItem('token');
+
+    const handleEvent = (event) => {
+      if (event.type === 'resync') {
+        fetchDashboardData();
+        return;
+      }
+      setStats(current => applyStatsEvent(current, event, user));
+      setRecentTasks(current => applyTaskEvent(current, event));
+    };
+
+    const connect = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          await readDashboardStream(token, controller.signal, handleEvent);
+        } catch (error) {
+          if (controller.signal.aborted) return;
+          console.error('Dashboard stream error:', error);
+        }
+        // Events may have been missed while disconnected, so catch up before reconnecting
+        await new Promise(resolve => setTimeout(resolve, STREAM_RETRY_MS));
+        if (!controller.signal.aborted) fetchDashboardData();
+      }
+    };
+
+    connect();
+    return () => controller.abort();
+  }, [user]);
+
   const fetchDashboardData = async () => {
     try {
       const token = localStorage.getItem('token');
       const headers = { 'Authorization': `Bearer ${token}` };
 
-      // Fetch dashboard stats
-      const statsResponse = await fetch('/api/dashboard/stats', { headers });
-      const statsData = await statsResponse.json();
-
-      // Fetch tasks (recent ones)
-      const tasksResponse = await fetch('/api/tasks', { headers });
-      const tasksData = await tasksResponse.json();
-
-      // Fetch projects
-      const projectsResponse = await fetch('/api/projects', { headers });
-      const projectsData = await projectsResponse.json();
+      // Stats, recent tasks and projects come back together from one request
+      const params = new URLSearchParams({
+        task_limit: String(RECENT_TASK_LIMIT),
+        task_fields: 'task_id,title,description,status,priority,created_at,total_hours',
+        project_fields: 'project_id,name,description,created_at',
+      });
+      const response = await fetch(`/api/dashboard?${params}`, { headers });
+      const data = await response.json();
 
-      setStats(statsData);
-      setRecentTasks(tasksData.slice(0, 5)); // Show only 5 recent tasks
-      setProjects(projectsData);
+      setStats(data.stats);
+      setRecentTasks(data.tasks || []);
+      setProjects(data.projects || []);
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
@@ -49,6 +49,14 @@ export default function EmployeePage() {
   }, [router]);
 
   const handleLogout = () => {
+    const token = localStorage.getItem('token');
+    if (token) {
+      // Revoke the token server-side; local logout proceeds regardless of the outcome
+      fetch('/api/auth/logout', {
+        method: 'POST',
+        headers: { 'Authorization': `Bearer ${token}` }
+      }).catch(() => {});
+    }
     localStorage.removeItem('token');
     localStorage.removeItem('user');
     router.push('/');
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Tests importing fastapi_app get the in-memory store and cheap password hashing
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from backend import InMemoryTaskManager, PasswordHasher, SyncTaskStore, TaskManager  # noqa: E402
+
+# The Mongo runs need a server; point TEST_MONGO_URI at one (e.g. mongodb://localhost:27017/) to enable them.
+# The TEST_MONGO_DB_NAME database is dropped before every test.
+TEST_MONGO_URI = os.getenv("TEST_MONGO_URI")
+TEST_MONGO_DB_NAME = os.getenv("TEST_MONGO_DB_NAME", "employee_management_test")
+
+
+@pytest.fixture(scope="session")
+def password_hasher():
+    hasher = PasswordHasher(rounds=4)
+    yield hasher
+    hasher.close()
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def store(request, password_hasher):
+    """An empty task store, driven through the blocking facade, once per backend."""
+    if request.param == "memory":
+        task_store = SyncTaskStore(InMemoryTaskManager(password_hasher=password_hasher))
+    else:
+        if not TEST_MONGO_URI:
+            pytest.skip("TEST_MONGO_URI is not set")
+        task_store = TaskManager(TEST_MONGO_URI, TEST_MONGO_DB_NAME, startup=False, password_hasher=password_hasher)
+        task_store.run(task_store.client.drop_database(TEST_MONGO_DB_NAME))
+        assert task_store.startup()
+    yield task_store
+    task_store.close()
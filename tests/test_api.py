@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+from prometheus_client import REGISTRY  # noqa: E402
+
+from fastapi_app import AdmissionLimit, AdmissionMiddleware, app, route_template  # noqa: E402
+
+
+def get(asgi_app, *paths):
+    async def run():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path) for path in paths]
+    return asyncio.run(run())
+
+
+def http_scope(method, path):
+    return {"type": "http", "method": method, "path": path, "root_path": "", "query_string": b"", "headers": []}
+
+
+@pytest.mark.parametrize("method, path, template", [
+    ("GET", "/reports/employees/7/hours", "/reports/employees/{employee_id}/hours"),
+    ("GET", "/tasks/search", "/tasks/search"),
+    ("POST", "/auth/login", "/auth/login"),
+    ("GET", "/no/such/route/42", "unmatched"),
+])
+def test_requests_are_labelled_by_route_template(method, path, template):
+    assert route_template(http_scope(method, path)) == template
+
+
+def test_full_admission_queue_sheds_with_503_and_retry_after():
+    async def run():
+        release = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        limit = AdmissionLimit("analytics", concurrency=1, max_queue=0, max_wait=1.0)
+        middleware = AdmissionMiddleware(slow_app, {"analytics": limit})
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            admitted = asyncio.create_task(client.get("/dashboard/stats"))
+            while not limit.active:
+                await asyncio.sleep(0)
+            shed = await client.get("/reports/hours")
+            unclassified = asyncio.create_task(client.get("/tasks"))
+            release.set()
+            return await admitted, shed, await unclassified, limit.active
+
+    rejections = ("http_admission_rejections_total", {"route_class": "analytics", "reason": "queue_full"})
+    before = REGISTRY.get_sample_value(*rejections) or 0
+    admitted, shed, unclassified, active = asyncio.run(run())
+    assert admitted.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert unclassified.status_code == 200
+    assert active == 0
+    assert REGISTRY.get_sample_value(*rejections) == before + 1
+
+
+def test_metrics_expose_requests_by_route_template():
+    root, missing, metrics = get(app, "/", "/no/such/route/42", "/metrics")
+    assert root.status_code == 200 and missing.status_code == 404
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    body = metrics.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/",status="200"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in body
+    assert "/no/such/route/42" not in body
+    assert "http_requests_in_flight" in body
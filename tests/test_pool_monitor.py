@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+from backend import PoolMonitor
+
+
+def checked_out(monitor, count):
+    event = SimpleNamespace(address=("db", 27017))
+    for _ in range(count):
+        monitor.connection_check_out_started(event)
+        monitor.connection_checked_out(event)
+
+
+def test_saturation_is_the_checked_out_share_of_the_pool():
+    monitor = PoolMonitor()
+    checked_out(monitor, 5)
+    stats = monitor.stats(20)
+    assert stats["saturation"] == 0.25
+    assert stats["servers"]["db:27017"]["checked_out"] == 5
+
+
+def test_an_unbounded_pool_never_saturates():
+    monitor = PoolMonitor()
+    checked_out(monitor, 5)
+    assert monitor.stats(0)["saturation"] == 0.0
@@ -0,0 +1,218 @@
+"""Behaviour every TaskStore backend must share, run against each one by the ``store`` fixture."""
+import pytest
+
+from backend import Employee, Manager, Project, Task, TaskAccess
+
+
+def seed(store, password_hasher):
+    password_hash = password_hasher.hash("secret")
+    store.add_employee(Manager(1, "Maya Manager", "maya@example.com", "secret", password_hash=password_hash))
+    store.add_employee(Employee(2, "Eli Employee", "eli@example.com", "secret", password_hash=password_hash))
+    store.add_employee(Employee(3, "Ada Employee", "ada@example.com", "secret", password_hash=password_hash))
+    store.add_project(Project(1, "Apollo", "Launch work", 1))
+    store.add_project(Project(2, "Gemini", "Follow-up work", 1))
+    store.add_tasks([
+        Task(1, "Write report", "Quarterly numbers", 2, "High", "Pending", project_id=1),
+        Task(2, "Review budget", "Check the spreadsheet", 2, "Low", "In Progress", project_id=1),
+        Task(3, "Plan offsite", "Book the venue", 3, "Medium", "Pending"),
+    ])
+    store.seed_counters()
+
+
+def test_ids_continue_after_stored_documents(store, password_hasher):
+    seed(store, password_hasher)
+    assert store.get_next_task_id() == 4
+    assert store.get_next_employee_id() == 4
+    assert store.get_next_project_id() == 3
+    assert store.reserve_task_ids(3) == [5, 6, 7]
+
+
+def test_duplicate_ids_are_rejected(store, password_hasher):
+    seed(store, password_hasher)
+    assert not store.add_task(Task(1, "Again", "", 2))
+    results = store.add_tasks([Task(3, "Again", "", 2), Task(4, "New", "", 2)])
+    assert [result["status"] for result in results] == ["error", "ok"]
+
+
+def test_task_lists_page_by_task_id(store, password_hasher):
+    seed(store, password_hasher)
+    assert [task["task_id"] for task in store.get_all_tasks()] == [1, 2, 3]
+    assert [task["task_id"] for task in store.get_all_tasks(after=1, limit=1)] == [2]
+    assert [task["task_id"] for task in store.get_tasks_by_employee(2)] == [1, 2]
+    assert [task["task_id"] for task in store.get_tasks_by_project(1, status="Pending")] == [1]
+    assert [task["task_id"] for task in store.get_tasks_without_project()] == [3]
+    assert store.get_all_tasks(fields=["title"])[0] == {"task_id": 1, "title": "Write report"}
+    assert store.get_task_by_id(1)["project_name"] == "Apollo"
+
+
+def test_writes_check_the_assignee(store, password_hasher):
+    seed(store, password_hasher)
+    assert store.check_task_access(1, 2) is TaskAccess.OK
+    assert store.check_task_access(1, 3) is TaskAccess.FORBIDDEN
+    assert store.check_task_access(99) is TaskAccess.NOT_FOUND
+    assert store.update_task_status(1, "Completed", assignee=3) is TaskAccess.FORBIDDEN
+    assert store.update_task_status(1, "Completed", assignee=2) is TaskAccess.OK
+    task = store.get_task_by_id(1)
+    assert task["status"] == "Completed" and task["completed_at"]
+    results = store.update_task_statuses([{"task_id": 2, "status": "Completed"}, {"task_id": 3, "status": "Completed"},
+                                          {"task_id": 99, "status": "Completed"}], assignee=2)
+    assert [result["status"] for result in results] == ["ok", "forbidden", "not_found"]
+
+
+def test_time_logs_roll_up_into_hours(store, password_hasher):
+    seed(store, password_hasher)
+    assert store.add_time_log(1, 2, 2.5, "drafting", assignee=2) is TaskAccess.OK
+    assert store.add_time_log(1, 3, 1.0, assignee=3) is TaskAccess.FORBIDDEN
+    results = store.add_time_logs([
+        {"task_id": 2, "employee_id": 2, "hours": 1.5, "logged_at": "2024-03-01T10:00:00"},
+        {"task_id": 3, "employee_id": 2, "hours": 4.0},
+    ], assignee=2)
+    assert [result["status"] for result in results] == ["ok", "forbidden"]
+
+    assert store.get_task_by_id(1)["total_hours"] == 2.5
+    assert store.get_hours() == 4.0
+    assert store.get_hours(employee_id=2) == 4.0
+    assert store.get_hours(project_id=1) == 4.0
+    assert [log["hours"] for log in store.get_task_time_logs(1)] == [2.5]
+    access, logs = store.get_task_time_logs_for(1, assignee=3)
+    assert access is TaskAccess.FORBIDDEN and logs == []
+    logs = store.get_employee_time_logs(2)
+    assert [(log["task_id"], log["task_title"]) for log in logs] == [(2, "Review budget"), (1, "Write report")]
+
+
+def test_moving_a_task_moves_its_hours(store, password_hasher):
+    seed(store, password_hasher)
+    store.add_time_log(1, 2, 3.0)
+    assert store.update_task_project(1, 2) is TaskAccess.OK
+    assert store.get_task_by_id(1)["project_name"] == "Gemini"
+    assert store.get_hours(project_id=1) == 0
+    assert store.get_hours(project_id=2) == 3.0
+    assert store.update_task_project(99, 2) is TaskAccess.NOT_FOUND
+
+
+def test_dashboard_stats(store, password_hasher):
+    seed(store, password_hasher)
+    store.add_time_log(3, 3, 2.0)
+    stats = store.get_dashboard_stats()
+    assert stats["total_tasks"] == 3
+    assert (stats["pending_tasks"], stats["in_progress_tasks"], stats["completed_tasks"]) == (2, 1, 0)
+    assert stats["priority_breakdown"] == {"high": 1, "medium": 1, "low": 1}
+    assert stats["total_hours"] == 2.0
+    employee_stats = store.get_dashboard_stats(3)
+    assert employee_stats["total_tasks"] == 1
+    dashboard = store.get_dashboard(employee_id=2, task_limit=1)
+    assert [task["task_id"] for task in dashboard["tasks"]] == [1]
+    assert [project["project_id"] for project in dashboard["projects"]] == [1, 2]
+
+
+def test_login_issues_a_revocable_token(store, password_hasher):
+    seed(store, password_hasher)
+    assert store.authenticate_employee("eli@example.com", "wrong") is None
+    login = store.authenticate_employee("eli@example.com", "secret")
+    assert login["employee_id"] == 2 and login["role"] == "Employee"
+    assert store.verify_token(login["token"])["employee_id"] == 2
+    assert store.revoke_token(login["token"])
+    assert store.verify_token(login["token"]) is None
+    assert not store.revoke_token(login["token"])
+
+
+def test_export_iterators_yield_batches(store, password_hasher):
+    seed(store, password_hasher)
+    store.add_time_logs([{"task_id": 1, "employee_id": 2, "hours": 1.0},
+                         {"task_id": 2, "employee_id": 2, "hours": 2.0}])
+    assert [[task["task_id"] for task in batch] for batch in store.iter_tasks(batch_size=2)] == [[1, 2], [3]]
+    assert sum(len(batch) for batch in store.iter_time_logs(project_id=1)) == 2
+    employees = [employee for batch in store.iter_employees() for employee in batch]
+    assert [employee["employee_id"] for employee in employees] == [1, 2, 3]
+    assert all("password_hash" not in employee for employee in employees)
+
+
+def test_retrying_a_time_log_does_not_count_it_twice(store, password_hasher):
+    seed(store, password_hasher)
+    assert store.add_time_log(1, 2, 2.0, log_id="retry-1") is TaskAccess.OK
+    assert store.add_time_log(1, 2, 2.0, log_id="retry-1") is TaskAccess.OK
+    assert store.add_time_log(2, 2, 2.0, log_id="retry-1") is TaskAccess.ERROR
+    assert store.get_task_by_id(1)["total_hours"] == 2.0
+    assert store.get_hours(employee_id=2) == 2.0
+    assert [log["log_id"] for log in store.get_task_time_logs(1)] == ["retry-1"]
+
+
+def test_bulk_time_logs_skip_retried_log_ids(store, password_hasher):
+    seed(store, password_hasher)
+    first = store.add_time_logs([{"task_id": 1, "employee_id": 2, "hours": 1.0, "log_id": "bulk-1"}])
+    results = store.add_time_logs([
+        {"task_id": 1, "employee_id": 2, "hours": 1.0, "log_id": "bulk-1"},
+        {"task_id": 2, "employee_id": 2, "hours": 1.0, "log_id": "bulk-1"},
+        {"task_id": 2, "employee_id": 2, "hours": 3.0, "log_id": "bulk-2"},
+        {"task_id": 2, "employee_id": 2, "hours": 3.0, "log_id": "bulk-2"},
+    ])
+    assert [result["status"] for result in first + results] == ["ok", "ok", "error", "ok", "ok"]
+    assert store.get_task_by_id(1)["total_hours"] == 1.0
+    assert store.get_task_by_id(2)["total_hours"] == 3.0
+    assert store.get_hours() == 4.0
+
+
+def test_writes_to_archived_tasks_report_archived(store, password_hasher):
+    seed(store, password_hasher)
+    store.update_task_status(3, "Completed")
+    assert store.archive_completed_tasks(-1) == 1
+    assert store.archive_completed_tasks(-1) == 0
+    assert store.get_task_by_id(3) is None and store.get_task_by_id(3, include_archived=True)["task_id"] == 3
+    assert store.update_task_status(3, "Pending") is TaskAccess.ARCHIVED
+    assert store.add_time_log(3, 3, 1.0) is TaskAccess.ARCHIVED
+    assert store.check_task_access(3) is TaskAccess.ARCHIVED
+    assert store.update_task_project(3, 1) is TaskAccess.ARCHIVED
+    assert store.update_task_status(99, "Pending") is TaskAccess.NOT_FOUND
+    results = store.add_time_logs([{"task_id": 3, "employee_id": 3, "hours": 1.0},
+                                   {"task_id": 99, "employee_id": 3, "hours": 1.0}])
+    assert [result["status"] for result in results] == ["archived", "not_found"]
+    results = store.update_task_statuses([{"task_id": 3, "status": "Pending"}])
+    assert [result["status"] for result in results] == ["archived"]
+    assert store.get_dashboard_stats()["completed_tasks"] == 1
+
+
+def test_a_lease_has_one_holder_until_it_expires(store):
+    assert store.acquire_lease("job", "worker-1", 60)
+    assert store.acquire_lease("job", "worker-1", 60)
+    assert not store.acquire_lease("job", "worker-2", 60)
+    assert store.acquire_lease("other-job", "worker-2", 60)
+    assert store.acquire_lease("expiring", "worker-1", -1)
+    assert store.acquire_lease("expiring", "worker-2", 60)
+
+
+def test_search_ranks_title_matches_first(store, password_hasher):
+    seed(store, password_hasher)
+    store.add_task(Task(4, "Budget summary", "Totals for the report", 3, "High", "Pending", project_id=2))
+    assert [task["task_id"] for task in store.search_tasks("report")] == [1, 4]
+    assert [task["task_id"] for task in store.search_tasks("budget")] == [2, 4]
+    assert [task["task_id"] for task in store.search_tasks("budget", assigned_to=3)] == [4]
+    assert [task["task_id"] for task in store.search_tasks("apollo")] == [1, 2]
+    assert [task["task_id"] for task in store.search_tasks("report budget", limit=2, skip=1)] == [1, 2]
+    assert store.search_tasks("venue", fields=["title"])[0].keys() == {"task_id", "title", "score"}
+    assert store.search_tasks("nothing") == []
+
+
+def test_startup_seeds_counters_even_when_indexes_fail(store, password_hasher):
+    seed(store, password_hasher)
+
+    async def indexes_failed():
+        return False
+
+    store.store.ensure_indexes = indexes_failed
+    assert not store.startup()
+    assert store.get_next_task_id() == 4
+
+
+def test_duplicate_keys_block_the_unique_indexes(store):
+    if not hasattr(store.store, "find_duplicate_keys"):
+        pytest.skip("only the MongoDB backend builds indexes")
+    employees = store.store.employees_collection
+    store.run(employees.drop_indexes())
+    store.run(employees.insert_many([{"employee_id": 7, "email": "a@example.com"},
+                                     {"employee_id": 7, "email": "b@example.com"}]))
+    assert store.find_duplicate_keys() == [
+        {"collection": "employees", "index": "employee_id_unique", "key": {"employee_id": 7}, "count": 2}
+    ]
+    assert not store.ensure_indexes()
+    store.run(employees.delete_one({"email": "b@example.com"}))
+    assert store.find_duplicate_keys() == [] and store.ensure_indexes()
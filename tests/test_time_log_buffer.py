@@ -0,0 +1,97 @@
+import asyncio
+
+from backend import TaskAccess, TimeLogWriteBuffer
+
+
+class FlakyStore:
+    """add_time_logs stand-in returning a scripted status per task_id and recording what it was sent."""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.batches = []
+
+    async def add_time_logs(self, entries, assignee=None):
+        self.batches.append(entries)
+        return [{"index": index, "status": self.statuses.get(entry["task_id"], TaskAccess.OK).value}
+                for index, entry in enumerate(entries)]
+
+
+def flush(buffer, times=1):
+    async def run():
+        for _ in range(times):
+            await buffer.flush()
+    asyncio.run(run())
+
+
+def test_entries_get_a_log_id_that_is_kept_across_retries():
+    store = FlakyStore({1: TaskAccess.ERROR})
+    buffer = TimeLogWriteBuffer(store, max_attempts=3)
+    buffer.submit({"task_id": 1, "employee_id": 2, "hours": 1.0})
+    flush(buffer, 2)
+    assert len(store.batches) == 2
+    assert store.batches[0][0]["log_id"] and store.batches[0][0]["log_id"] == store.batches[1][0]["log_id"]
+    assert buffer.stats()["pending_entries"] == 1
+
+
+def test_unwritable_entries_are_parked_after_max_attempts():
+    store = FlakyStore({1: TaskAccess.ERROR})
+    buffer = TimeLogWriteBuffer(store, max_attempts=3)
+    buffer.submit({"task_id": 1, "employee_id": 2, "hours": 1.0})
+    buffer.submit({"task_id": 2, "employee_id": 2, "hours": 1.0})
+    flush(buffer, 4)
+    assert len(store.batches) == 3
+    assert [entry["task_id"] for entry in buffer.parked] == [1]
+    stats = buffer.stats()
+    assert (stats["pending_entries"], stats["parked_entries"], stats["flushed_entries"], stats["failed_entries"]) \
+        == (0, 1, 1, 3)
+
+
+def test_entries_rejected_at_flush_time_are_dropped():
+    store = FlakyStore({1: TaskAccess.NOT_FOUND, 2: TaskAccess.FORBIDDEN})
+    buffer = TimeLogWriteBuffer(store)
+    for task_id in (1, 2, 3):
+        buffer.submit({"task_id": task_id, "employee_id": 2, "hours": 1.0})
+    flush(buffer, 2)
+    stats = buffer.stats()
+    assert (stats["pending_entries"], stats["flushed_entries"], stats["rejected_entries"]) == (0, 1, 2)
+    assert stats["flushes"] == 1
+
+
+class BrokenStore(FlakyStore):
+    """Raises from add_time_logs for the first ``failures`` calls."""
+
+    def __init__(self, failures):
+        super().__init__({})
+        self.failures = failures
+
+    async def add_time_logs(self, entries, assignee=None):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("store unavailable")
+        return await super().add_time_logs(entries, assignee)
+
+
+def test_entries_are_requeued_when_the_flush_raises():
+    store = BrokenStore(failures=1)
+    buffer = TimeLogWriteBuffer(store)
+    buffer.submit({"task_id": 1, "employee_id": 2, "hours": 1.0})
+    flush(buffer)
+    assert buffer.stats()["pending_entries"] == 1
+    flush(buffer)
+    stats = buffer.stats()
+    assert (stats["pending_entries"], stats["flushed_entries"], stats["failed_entries"]) == (0, 1, 1)
+
+
+def test_the_flusher_survives_a_failed_flush():
+    async def run():
+        store = BrokenStore(failures=1)
+        buffer = TimeLogWriteBuffer(store, flush_interval_ms=5)
+        buffer.start()
+        buffer.submit({"task_id": 1, "employee_id": 2, "hours": 1.0})
+        await asyncio.sleep(0.1)
+        running = not buffer._runner.done()
+        await buffer.close()
+        return running, store.batches
+    running, batches = asyncio.run(run())
+    assert running
+    assert [[entry["task_id"] for entry in batch] for batch in batches] == [[1]]
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("fastapi")
+pydantic = pytest.importorskip("pydantic")
+
+from fastapi_app import TimeLogBulkCreate, TimeLogCreate  # noqa: E402
+
+
+@pytest.mark.parametrize("hours", [0, -1.5, float("nan"), float("inf")])
+def test_hours_must_be_positive_and_finite(hours):
+    with pytest.raises(pydantic.ValidationError):
+        TimeLogCreate(hours=hours)
+    with pytest.raises(pydantic.ValidationError):
+        TimeLogBulkCreate(task_id=1, hours=hours)
+
+
+def test_aware_logged_at_becomes_naive_local_time():
+    aware = datetime(2024, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    log = TimeLogBulkCreate(task_id=1, hours=1, logged_at=aware)
+    assert log.logged_at.tzinfo is None
+    assert log.logged_at == aware.astimezone().replace(tzinfo=None)
+    assert TimeLogBulkCreate(task_id=1, hours=1, logged_at="2024-03-01T10:00:00").logged_at == datetime(2024, 3, 1, 10)
+
+
+@pytest.mark.parametrize("logged_at", [datetime.now() + timedelta(days=1), "not a timestamp"])
+def test_future_or_unparsable_logged_at_is_rejected(logged_at):
+    with pytest.raises(pydantic.ValidationError):
+        TimeLogBulkCreate(task_id=1, hours=1, logged_at=logged_at)